@@ -0,0 +1,105 @@
+from datetime import date, timedelta, timezone
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from models import ActivityDay, UserStats
+
+# One row per (user, UTC day) with at least one push. /streak and the heatmap
+# read a bounded range of these rows instead of every push log. Rows are
+# upserted in the push transaction, which also raises user_stats.longest_streak
+# when the streak ending on the push day beats it; a streak only grows by a
+# push, so that keeps the record exact. scripts/backfill_activity_days.py
+# builds both from push_logs.
+
+# Days without a push that a streak survives ("frozen" days)
+MAX_FROZEN_DAYS = 4
+STREAK_FETCH_DAYS = 366
+
+
+def utc_day(timestamp) -> date:
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc)
+    return timestamp.date()
+
+
+async def apply_to_activity(db, user_id: int, timestamps):
+    """Count pushes per day for a user and update their longest streak; the caller commits"""
+    counts = {}
+    for timestamp in timestamps:
+        day = utc_day(timestamp)
+        counts[day] = counts.get(day, 0) + 1
+    if not counts:
+        return
+
+    stmt = pg_insert(ActivityDay).values([
+        {"user_id": user_id, "day": day, "count": count} for day, count in counts.items()
+    ])
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", "day"],
+        set_={"count": ActivityDay.count + stmt.excluded.count}
+    ))
+
+    streak = (await current_streak(db, user_id, max(counts)))["streak"]
+    await db.execute(
+        update(UserStats)
+        .where(UserStats.user_id == user_id)
+        .values(longest_streak=func.greatest(UserStats.longest_streak, streak))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def streak_days_query(user_id: int, upto: date):
+    """The user's next STREAK_FETCH_DAYS active days going back from upto"""
+    return (
+        select(ActivityDay.day)
+        .where(ActivityDay.user_id == user_id, ActivityDay.day <= upto)
+        .order_by(ActivityDay.day.desc())
+        .limit(STREAK_FETCH_DAYS)
+    )
+
+
+def activity_between_query(user_id: int, first: date, last: date):
+    return (
+        select(ActivityDay.day, ActivityDay.count)
+        .where(ActivityDay.user_id == user_id, ActivityDay.day >= first, ActivityDay.day <= last)
+        .order_by(ActivityDay.day)
+    )
+
+
+async def current_streak(db, user_id: int, today: date) -> dict:
+    """Walk active days backwards from today; each missing day uses up a frozen day.
+
+    Reads only as many rows as the streak is long (in chunks), never the whole history.
+    """
+    streak, frozen = 0, 0
+    expected = today
+    while True:
+        result = await db.execute(streak_days_query(user_id, expected))
+        days = result.scalars().all()
+        for day in days:
+            gap = (expected - day).days
+            if frozen + gap > MAX_FROZEN_DAYS:
+                return {"streak": streak, "frozen_used": frozen}
+            frozen += gap
+            streak += 1
+            expected = day - timedelta(days=1)
+        if len(days) < STREAK_FETCH_DAYS:
+            return {"streak": streak, "frozen_used": frozen}
+
+
+def longest_streak(days: list) -> int:
+    """Most active days in a run whose gaps add up to at most MAX_FROZEN_DAYS (days ascending)"""
+    best, start, gaps = 0, 0, 0
+    for end in range(len(days)):
+        if end > 0:
+            gaps += (days[end] - days[end - 1]).days - 1
+        while gaps > MAX_FROZEN_DAYS:
+            gaps -= (days[start + 1] - days[start]).days - 1
+            start += 1
+        best = max(best, end - start + 1)
+    return best
+
+
+async def activity_between(db, user_id: int, first: date, last: date) -> dict:
+    """day -> push count for the user's active days in [first, last]"""
+    result = await db.execute(activity_between_query(user_id, first, last))
+    return {day: count for day, count in result.all()}
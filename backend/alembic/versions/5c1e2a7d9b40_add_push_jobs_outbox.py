@@ -0,0 +1,52 @@
+"""add push_jobs outbox
+
+Revision ID: 5c1e2a7d9b40
+Revises: fffe4c516230
+Create Date: 2026-10-18 15:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e2a7d9b40'
+down_revision: Union[str, None] = 'fffe4c516230'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('push_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('push_log_id', sa.Integer(), nullable=True),
+    sa.Column('repo', sa.String(), nullable=True),
+    sa.Column('filename', sa.String(), nullable=True),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('commit_sha', sa.String(), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['push_log_id'], ['push_logs.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_push_jobs_id'), 'push_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_push_jobs_user_id'), 'push_jobs', ['user_id'], unique=False)
+    op.create_index(op.f('ix_push_jobs_status'), 'push_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_push_jobs_status'), table_name='push_jobs')
+    op.drop_index(op.f('ix_push_jobs_user_id'), table_name='push_jobs')
+    op.drop_index(op.f('ix_push_jobs_id'), table_name='push_jobs')
+    op.drop_table('push_jobs')
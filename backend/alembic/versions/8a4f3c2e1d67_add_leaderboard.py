@@ -0,0 +1,39 @@
+"""add leaderboard
+
+Revision ID: 8a4f3c2e1d67
+Revises: 5c1e2a7d9b40
+Create Date: 2026-10-18 16:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4f3c2e1d67'
+down_revision: Union[str, None] = '5c1e2a7d9b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('leaderboard',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total_solved', sa.Integer(), nullable=False),
+    sa.Column('total_point', sa.Integer(), nullable=False),
+    sa.Column('by_language', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index('ix_leaderboard_total_point_user_id', 'leaderboard', [sa.text('total_point DESC'), 'user_id'], unique=False)
+    # Populate with: python scripts/rebuild_leaderboard.py
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_leaderboard_total_point_user_id', table_name='leaderboard')
+    op.drop_table('leaderboard')
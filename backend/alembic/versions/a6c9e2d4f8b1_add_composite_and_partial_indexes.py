@@ -0,0 +1,45 @@
+"""add composite and partial indexes for hot read paths
+
+Revision ID: a6c9e2d4f8b1
+Revises: f2b7c4e8a5d3
+Create Date: 2026-10-18 20:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c9e2d4f8b1'
+down_revision: Union[str, None] = 'f2b7c4e8a5d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_JOB = sa.text("status IN ('pending', 'running')")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY so push_logs / push_jobs keep taking writes while these build
+    with op.get_context().autocommit_block():
+        op.create_index('ix_push_logs_user_id_timestamp', 'push_logs', ['user_id', sa.text('timestamp DESC')],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index('ix_push_logs_unlinked_slug', 'push_logs', ['problem_slug'],
+                        unique=False, postgresql_where=sa.text('problem_id IS NULL'), postgresql_concurrently=True)
+        op.create_index('ix_solutions_user_id_problem_slug', 'solutions', ['user_id', 'problem_slug'],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index('ix_push_jobs_open', 'push_jobs', ['id'],
+                        unique=False, postgresql_where=OPEN_JOB, postgresql_concurrently=True)
+        op.create_index('ix_push_jobs_open_user_repo', 'push_jobs', ['user_id', 'repo', 'id'],
+                        unique=False, postgresql_where=OPEN_JOB, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_push_jobs_open_user_repo', table_name='push_jobs')
+    op.drop_index('ix_push_jobs_open', table_name='push_jobs')
+    op.drop_index('ix_solutions_user_id_problem_slug', table_name='solutions')
+    op.drop_index('ix_push_logs_unlinked_slug', table_name='push_logs')
+    op.drop_index('ix_push_logs_user_id_timestamp', table_name='push_logs')
@@ -0,0 +1,37 @@
+"""add user_stats
+
+Revision ID: b7d2e9f4a013
+Revises: 8a4f3c2e1d67
+Create Date: 2026-10-18 17:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e9f4a013'
+down_revision: Union[str, None] = '8a4f3c2e1d67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total_solved', sa.Integer(), nullable=False),
+    sa.Column('by_language', sa.JSON(), nullable=False),
+    sa.Column('recent', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Populate with: python scripts/rebuild_user_stats.py
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_stats')
@@ -0,0 +1,78 @@
+"""add problem_slug, problem_id and point to push_logs
+
+Revision ID: c3a8d5e1f6b2
+Revises: b7d2e9f4a013
+Create Date: 2026-10-18 17:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a8d5e1f6b2'
+down_revision: Union[str, None] = 'b7d2e9f4a013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+# SQL version of utils.leetcode.problem_slug_from_filename:
+# '0001_Two_Sum.py' -> 'two-sum'
+SLUG_FROM_FILENAME = r"""
+lower(replace(
+    regexp_replace(
+        CASE WHEN strpos(filename, '_') > 0 THEN substr(filename, strpos(filename, '_') + 1) ELSE filename END,
+        '\.[^.]*$', ''
+    ),
+    '_', '-'
+))
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('push_logs', sa.Column('problem_slug', sa.String(), nullable=True))
+    op.add_column('push_logs', sa.Column('problem_id', sa.Integer(), nullable=True))
+    op.add_column('push_logs', sa.Column('point', sa.Integer(), nullable=True))
+    op.create_foreign_key('push_logs_problem_id_fkey', 'push_logs', 'problems', ['problem_id'], ['id'])
+
+    # The ALTERs above hold an ACCESS EXCLUSIVE lock until their transaction
+    # commits; autocommit_block() commits it first, then every batch commits on
+    # its own so reads and writes on push_logs only wait for one batch at a time
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        low, high = bind.execute(sa.text("SELECT min(id), max(id) FROM push_logs")).one()
+        if low is not None:
+            for start in range(low, high + 1, BATCH_SIZE):
+                bind.execute(
+                    sa.text(f"""
+                        UPDATE push_logs pl
+                        SET problem_slug = s.slug, problem_id = p.id, point = p.point
+                        FROM (
+                            SELECT id, {SLUG_FROM_FILENAME} AS slug
+                            FROM push_logs
+                            WHERE id >= :start AND id < :stop AND filename IS NOT NULL
+                        ) s
+                        LEFT JOIN problems p ON p.slug = s.slug
+                        WHERE pl.id = s.id
+                    """),
+                    {"start": start, "stop": start + BATCH_SIZE}
+                )
+
+        # Created after the backfill so the updates don't maintain it row by row;
+        # CONCURRENTLY so push_logs keeps taking writes while it builds
+        op.create_index(op.f('ix_push_logs_problem_slug'), 'push_logs', ['problem_slug'],
+                        unique=False, postgresql_concurrently=True)
+    # Aggregates changed source (stored points): re-run scripts/rebuild_leaderboard.py
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_push_logs_problem_slug'), table_name='push_logs')
+    op.drop_constraint('push_logs_problem_id_fkey', 'push_logs', type_='foreignkey')
+    op.drop_column('push_logs', 'point')
+    op.drop_column('push_logs', 'problem_id')
+    op.drop_column('push_logs', 'problem_slug')
@@ -0,0 +1,28 @@
+"""add frontend_id to problems
+
+Revision ID: d9e4b6a2c8f1
+Revises: c3a8d5e1f6b2
+Create Date: 2026-10-18 18:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9e4b6a2c8f1'
+down_revision: Union[str, None] = 'c3a8d5e1f6b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('problems', sa.Column('frontend_id', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('problems', 'frontend_id')
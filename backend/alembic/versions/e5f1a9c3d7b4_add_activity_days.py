@@ -0,0 +1,37 @@
+"""add activity_days and user_stats.longest_streak
+
+Revision ID: e5f1a9c3d7b4
+Revises: d9e4b6a2c8f1
+Create Date: 2026-10-18 19:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f1a9c3d7b4'
+down_revision: Union[str, None] = 'd9e4b6a2c8f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('activity_days',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+    op.add_column('user_stats', sa.Column('longest_streak', sa.Integer(), server_default='0', nullable=False))
+    # Populate with: python scripts/backfill_activity_days.py
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('user_stats', 'longest_streak')
+    op.drop_table('activity_days')
@@ -0,0 +1,34 @@
+"""add user search indexes
+
+Revision ID: f2b7c4e8a5d3
+Revises: e5f1a9c3d7b4
+Create Date: 2026-10-18 20:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b7c4e8a5d3'
+down_revision: Union[str, None] = 'e5f1a9c3d7b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # prefix (typeahead) search: lower(username) LIKE 'q%' ordered by lower(username);
+    # C collation makes the btree usable for both the LIKE range and the ORDER BY
+    op.execute('CREATE INDEX ix_users_username_lower_prefix ON users ((lower(username) COLLATE "C"), id)')
+    # substring search: lower(username) LIKE '%q%'
+    op.execute("CREATE INDEX ix_users_username_lower_trgm ON users USING gin (lower(username) gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_users_username_lower_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_users_username_lower_prefix")
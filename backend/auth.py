@@ -2,8 +2,12 @@ from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from fastapi import Header, HTTPException
 import os
+import time
+import hashlib
 from dotenv import load_dotenv
 import traceback
+from utils.cache import TTLCache
+from utils.cache_backend import get_cache
 
 # Load environment variables
 def get_database_url():
@@ -27,6 +31,32 @@ SECRET_KEY = os.getenv("JWT_SECRET")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 30  # 30 days
 
+# GitHub ids (comma separated) allowed to use the /admin endpoints; empty means nobody
+ADMIN_GITHUB_IDS = {g.strip() for g in os.getenv("ADMIN_GITHUB_IDS", "").split(",") if g.strip()}
+if not ADMIN_GITHUB_IDS:
+    print("[auth.py] ADMIN_GITHUB_IDS is not set, /admin endpoints are disabled")
+
+# Verified tokens are cached by digest until their exp, so a client polling
+# /stats with the same token pays for jwt.decode once. That cache is bounded
+# (LRU) and per process. Revocations (revoke_token: logout, admin) live in the
+# shared cache backend so every worker sees them and they survive a restart
+# with CACHE_BACKEND=redis; each is kept, never LRU-evicted, until the token
+# would have expired anyway, and is checked before the verified-token cache.
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "4096"))
+
+_verified = TTLCache(maxsize=JWT_CACHE_SIZE, ttl=0)
+_revoked = get_cache("jwt_revoked", maxsize=0, ttl=0)
+_verify_stats = {
+    "hit_ms": 0.0,
+    "miss_ms": 0.0,
+    "rejected": 0,
+    "revoked": 0,
+}
+
+
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
 def create_jwt_token(data: dict):
     """Create a new JWT token with expiration"""
     to_encode = data.copy()
@@ -40,15 +70,12 @@ def create_access_token(data: dict):
     """Alias for create_jwt_token for backward compatibility"""
     return create_jwt_token(data)
 
-def verify_token(token: str):
-    """Verify and decode a JWT token"""
-
+def _decode_token(token: str):
     try:
+        # jwt.decode already rejects an expired exp; we only insist that there is one
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         if "exp" not in payload:
             return None
-        if datetime.utcnow() > datetime.fromtimestamp(payload["exp"]):
-            return None
         return payload
     except JWTError as e:
         print(f"JWT verification error: {str(e)}")
@@ -58,12 +85,61 @@ def verify_token(token: str):
 
         return None
 
+async def verify_token(token: str):
+    """Verify and decode a JWT token (cached until it expires); None if invalid or revoked"""
+    started = time.perf_counter()
+    digest = _token_digest(token)
+    if await _revoked.get(digest) is not None:
+        _verify_stats["rejected"] += 1
+        return None
+
+    payload = _verified.get(digest)
+    if payload is not None:
+        _verify_stats["hit_ms"] += (time.perf_counter() - started) * 1000
+        # callers get their own copy so nobody can mutate the cached entry
+        return dict(payload)
+
+    payload = _decode_token(token)
+    if payload:
+        remaining = payload["exp"] - time.time()
+        if remaining > 0:
+            _verified.set(digest, payload, ttl=remaining)
+        payload = dict(payload)
+    else:
+        _verify_stats["rejected"] += 1
+    _verify_stats["miss_ms"] += (time.perf_counter() - started) * 1000
+    return payload
+
+async def revoke_token(token: str) -> bool:
+    """Refuse a token from now on, in every worker (logout, leaked token); False if it was not valid anyway"""
+    digest = _token_digest(token)
+    payload = _decode_token(token)
+    _verified.delete(digest)
+    # no need to remember it past its exp, jwt.decode rejects it from then on
+    remaining = payload["exp"] - time.time() if payload else 0
+    if remaining <= 0:
+        return False
+    await _revoked.set(digest, True, ttl=remaining)
+    _verify_stats["revoked"] += 1
+    return True
+
+def get_jwt_cache_stats():
+    stats = _verified.stats()
+    return {
+        **stats,
+        "revocations": _revoked.stats(),
+        "rejected": _verify_stats["rejected"],
+        "revoked": _verify_stats["revoked"],
+        "avg_hit_ms": round(_verify_stats["hit_ms"] / stats["hits"], 4) if stats["hits"] else 0.0,
+        "avg_miss_ms": round(_verify_stats["miss_ms"] / stats["misses"], 4) if stats["misses"] else 0.0,
+    }
+
 async def get_current_user(authorization: str = Header(...)):
     """Get current user from authorization header"""
     try:
 
         token = authorization.replace("Bearer ", "")
-        payload = verify_token(token)
+        payload = await verify_token(token)
         if not payload:
 
             raise HTTPException(
@@ -78,3 +154,9 @@ async def get_current_user(authorization: str = Header(...)):
             detail=f"Authorization failed: {str(e)}"
         )
 
+async def require_admin(authorization: str = Header(...)):
+    """Dependency for /admin: a valid token whose github_id is in ADMIN_GITHUB_IDS"""
+    user = await get_current_user(authorization)
+    if str(user.get("github_id")) not in ADMIN_GITHUB_IDS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user
@@ -0,0 +1,93 @@
+import os
+from typing import NamedTuple, Optional
+from fastapi import Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import User
+from database import get_db
+from auth import get_current_user
+from utils.cache import TTLCache
+
+# The authenticated user as a small immutable record, so handlers do not each
+# run their own select(User) by github_id. Records are cached per process for
+# a short TTL and dropped on login (new access token) and on repository change;
+# other workers pick the change up when their entry expires. The record holds
+# the GitHub access token, which is why it stays in process memory and never
+# goes to the shared cache backend.
+#
+# Tokens issued since the "uid" claim was added carry the internal user id, so
+# endpoints that only need the id (get_current_user_id) skip the lookup
+# entirely.
+
+CURRENT_USER_CACHE_TTL = float(os.getenv("CURRENT_USER_CACHE_TTL", "30"))
+CURRENT_USER_CACHE_SIZE = int(os.getenv("CURRENT_USER_CACHE_SIZE", "4096"))
+
+_users = TTLCache(maxsize=CURRENT_USER_CACHE_SIZE, ttl=CURRENT_USER_CACHE_TTL)
+_stats = {
+    "uid_claims": 0,
+    "invalidations": 0,
+}
+
+
+class CurrentUser(NamedTuple):
+    id: int
+    github_id: str
+    username: str
+    selected_repo: Optional[str]
+    access_token: Optional[str]
+
+
+def invalidate_current_user(github_id: str):
+    """Call after changing a user's row (login, selected repository)"""
+    _users.delete(github_id)
+    _stats["invalidations"] += 1
+
+
+def current_user_query(github_id: str):
+    return (
+        select(User.id, User.github_id, User.username, User.selected_repo, User.access_token)
+        .where(User.github_id == github_id)
+    )
+
+
+async def load_current_user(db: AsyncSession, github_id: str) -> Optional[CurrentUser]:
+    record = _users.get(github_id)
+    if record is None:
+        result = await db.execute(current_user_query(github_id))
+        row = result.one_or_none()
+        if row is None:
+            return None
+        record = CurrentUser(*row)
+        _users.set(github_id, record)
+    return record
+
+
+async def get_current_user_record(
+    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> CurrentUser:
+    """Dependency: the authenticated user's record (404 if the account is gone)"""
+    github_id = user.get("github_id")
+    if not github_id:
+        raise HTTPException(status_code=401, detail="GitHub ID not found in token")
+
+    record = await load_current_user(db, github_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return record
+
+
+async def get_current_user_id(
+    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> int:
+    """Dependency: the authenticated user's id, straight from the token when it has one"""
+    uid = user.get("uid")
+    if uid is not None:
+        _stats["uid_claims"] += 1
+        return int(uid)
+    return (await get_current_user_record(user, db)).id
+
+
+def get_current_user_cache_stats():
+    return {**_users.stats(), **_stats}
@@ -22,11 +22,37 @@ else:
 DATABASE_URL = os.getenv("DATABASE_URL")
 print(f"[database.py] Loaded DATABASE_URL: {DATABASE_URL}", flush=True)
 
+# Engine profile. Echo is off by default: it logs every statement
+# synchronously to stdout. Pool limits are per process, so the total number
+# of connections is (DB_POOL_SIZE + DB_MAX_OVERFLOW) x uvicorn workers.
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # below typical proxy idle timeouts
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# asyncpg prepared statements kept per connection; 0 when behind pgbouncer in transaction mode
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+
 if "alembic" in sys.argv[0]:
-    engine = create_engine(DATABASE_URL.replace("+asyncpg", ""), future=True, echo=True)
+    engine = create_engine(DATABASE_URL.replace("+asyncpg", ""), future=True, echo=DB_ECHO)
     SessionLocal = sessionmaker(bind=engine)
 else:
-    engine = create_async_engine(DATABASE_URL, future=True, echo=True)
+    from db_metrics import InstrumentedQueuePool, instrument_engine
+
+    engine = create_async_engine(
+        DATABASE_URL,
+        future=True,
+        echo=DB_ECHO,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args={"prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE},
+    )
+    instrument_engine(engine.sync_engine)
     SessionLocal = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
 Base = declarative_base()
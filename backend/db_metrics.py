@@ -0,0 +1,125 @@
+import os
+import time
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Pool and statement instrumentation for the app engine, served at
+# /admin/metrics/db. Wait time is measured around the pool's own get, so it
+# is the time a request spent queued for a connection (the number that grows
+# when pool_size + max_overflow is too small). Statement timings come from
+# the cursor execute events and are grouped by SQL text, which with bound
+# parameters is one entry per distinct query shape.
+
+DB_STATEMENT_STATS_SIZE = int(os.getenv("DB_STATEMENT_STATS_SIZE", "200"))
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "500"))
+
+_pool_stats = {
+    "checkouts": 0,
+    "timeouts": 0,
+    "wait_total_ms": 0.0,
+    "wait_max_ms": 0.0,
+    "connects": 0,
+    "invalidated": 0,
+}
+_statements = {}
+_statement_totals = {
+    "statements": 0,
+    "errors": 0,
+    "slow": 0,
+    "untracked": 0,
+}
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            _pool_stats["timeouts"] += 1
+            raise
+        finally:
+            waited = (time.perf_counter() - started) * 1000
+            _pool_stats["wait_total_ms"] += waited
+            _pool_stats["wait_max_ms"] = max(_pool_stats["wait_max_ms"], waited)
+
+
+def _record_statement(statement: str, elapsed: float):
+    _statement_totals["statements"] += 1
+    if elapsed >= DB_SLOW_QUERY_MS:
+        _statement_totals["slow"] += 1
+        print(f"[db_metrics.py] Slow query ({elapsed:.1f} ms): {statement[:200]}")
+
+    entry = _statements.get(statement)
+    if entry is None:
+        if len(_statements) >= DB_STATEMENT_STATS_SIZE:
+            _statement_totals["untracked"] += 1
+            return
+        entry = _statements[statement] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+    entry["count"] += 1
+    entry["total_ms"] += elapsed
+    entry["max_ms"] = max(entry["max_ms"], elapsed)
+
+
+def instrument_engine(engine):
+    """Attach the pool and statement listeners (pass the sync engine)"""
+
+    @event.listens_for(engine.pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        _pool_stats["connects"] += 1
+
+    @event.listens_for(engine.pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        _pool_stats["checkouts"] += 1
+
+    @event.listens_for(engine.pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        _pool_stats["invalidated"] += 1
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        _record_statement(statement, (time.perf_counter() - started) * 1000)
+
+    @event.listens_for(engine, "handle_error")
+    def on_error(exception_context):
+        _statement_totals["errors"] += 1
+        started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+        if started:
+            started.pop()
+
+
+def get_db_stats(engine, top: int = 20):
+    pool = engine.pool
+    checkouts = _pool_stats["checkouts"]
+    slowest = sorted(_statements.items(), key=lambda item: item[1]["total_ms"], reverse=True)[:top]
+    stats = {
+        "pool": {
+            "class": type(pool).__name__,
+            "status": pool.status(),
+            **_pool_stats,
+            "wait_avg_ms": round(_pool_stats["wait_total_ms"] / checkouts, 3) if checkouts else 0.0,
+        },
+        **_statement_totals,
+        "top_statements": [
+            {
+                "statement": statement[:500],
+                "count": entry["count"],
+                "total_ms": round(entry["total_ms"], 3),
+                "avg_ms": round(entry["total_ms"] / entry["count"], 3),
+                "max_ms": round(entry["max_ms"], 3),
+            }
+            for statement, entry in slowest
+        ],
+    }
+    # QueuePool only
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, name):
+            stats["pool"][name] = getattr(pool, name)()
+    return stats
@@ -0,0 +1,75 @@
+import os
+from fastapi import HTTPException
+from github_client import github_request, token_key
+from utils.cache_backend import get_cache
+
+# Per-token cache of the Authorization scheme GitHub accepted ("token" or
+# "Bearer") and the login it resolved to, so a push does not have to probe
+# GET /user with both prefixes before doing any real work.
+
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_AUTH_CACHE_TTL = float(os.getenv("GITHUB_AUTH_CACHE_TTL", "900"))
+GITHUB_AUTH_CACHE_SIZE = int(os.getenv("GITHUB_AUTH_CACHE_SIZE", "4096"))
+
+AUTH_SCHEMES = ("token", "Bearer")
+
+_auth_cache = get_cache("github_auth", maxsize=GITHUB_AUTH_CACHE_SIZE, ttl=GITHUB_AUTH_CACHE_TTL)
+
+
+def build_github_headers(access_token: str, scheme: str = "token") -> dict:
+    return {
+        "Authorization": f"{scheme} {access_token}",
+        "Accept": "application/vnd.github+json",
+        "User-Agent": "LIT1337-App/1.0",
+        "X-GitHub-Api-Version": "2022-11-28"
+    }
+
+
+async def get_cached_github_auth(access_token: str):
+    return await _auth_cache.get(token_key(access_token))
+
+
+async def remember_github_auth(access_token: str, scheme: str, login: str):
+    await _auth_cache.set(token_key(access_token), {"scheme": scheme, "login": login})
+
+
+async def invalidate_github_auth(access_token: str):
+    """Forget what we know about a token, e.g. after GitHub answered 401"""
+    await _auth_cache.delete(token_key(access_token))
+
+
+async def github_headers(access_token: str, default_scheme: str = "Bearer") -> dict:
+    """Headers for a token, using the cached scheme when we already know it"""
+    cached = await get_cached_github_auth(access_token)
+    scheme = cached["scheme"] if cached else default_scheme
+    return build_github_headers(access_token, scheme)
+
+
+async def resolve_github_auth(access_token: str) -> dict:
+    """Return {"scheme", "login", "headers"} for a token, probing GET /user only on a cache miss"""
+    cached = await get_cached_github_auth(access_token)
+    if cached:
+        return {**cached, "headers": build_github_headers(access_token, cached["scheme"])}
+
+    user_res = None
+    for scheme in AUTH_SCHEMES:
+        print(f"[github_auth.py] Auth probe with '{scheme}' prefix")
+        headers = build_github_headers(access_token, scheme)
+        user_res = await github_request(
+            "GET", f"{GITHUB_API_URL}/user",
+            access_token=access_token, headers=headers, timeout=15.0
+        )
+        if user_res.status_code == 200:
+            login = user_res.json().get("login")
+            print(f"[github_auth.py] '{scheme}' prefix worked, authenticated as: {login}")
+            await remember_github_auth(access_token, scheme, login)
+            return {"scheme": scheme, "login": login, "headers": headers}
+
+    print(f"[github_auth.py] Both authentication attempts failed: {user_res.status_code} - {user_res.text}")
+    if user_res.status_code == 401:
+        raise HTTPException(status_code=401, detail="GitHub authentication failed - token might be invalid or expired")
+    raise HTTPException(status_code=user_res.status_code, detail=f"GitHub API error: {user_res.text}")
+
+
+def get_github_auth_cache_stats():
+    return _auth_cache.stats()
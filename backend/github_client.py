@@ -0,0 +1,249 @@
+import os
+import asyncio
+import hashlib
+import httpx
+from utils.cache import TTLCache
+from github_resilience import breaker, retry_delay, should_retry_error, should_retry_status, RETRYABLE_STATUS
+from github_ratelimit import scheduler, PRIORITY_NORMAL, GITHUB_RATELIMIT_MAX_WAIT
+
+# Shared, pooled HTTP client for every call to github.com / api.github.com.
+# Created on startup in main.py and closed on shutdown so keep-alive
+# connections are reused across requests instead of paying a TCP+TLS
+# handshake per call.
+
+GITHUB_POOL_MAX_CONNECTIONS = int(os.getenv("GITHUB_POOL_MAX_CONNECTIONS", "50"))
+GITHUB_POOL_MAX_KEEPALIVE = int(os.getenv("GITHUB_POOL_MAX_KEEPALIVE", "20"))
+GITHUB_POOL_KEEPALIVE_EXPIRY = float(os.getenv("GITHUB_POOL_KEEPALIVE_EXPIRY", "30"))
+GITHUB_HTTP2 = os.getenv("GITHUB_HTTP2", "false").lower() in ("1", "true", "yes")
+GITHUB_DEFAULT_TIMEOUT = float(os.getenv("GITHUB_DEFAULT_TIMEOUT", "15"))
+
+_client = None
+_client_http2 = False
+
+GITHUB_ETAG_CACHE_SIZE = int(os.getenv("GITHUB_ETAG_CACHE_SIZE", "2048"))
+
+# LRU of conditional-request validators and bodies, keyed by (token hash, URL, Accept)
+_etag_cache = TTLCache(maxsize=GITHUB_ETAG_CACHE_SIZE, ttl=0)
+
+_etag_stats = {
+    "conditional_requests": 0,
+    "not_modified": 0,
+}
+
+_connection_stats = {
+    "requests": 0,
+    "new_connections": 0,
+    "reused_connections": 0,
+}
+
+
+async def _on_request(request: httpx.Request):
+    # httpcore reports connection setup through the "trace" extension; a
+    # request that never sees connect_tcp was served from the pool.
+    state = {"new_connection": False}
+
+    async def trace(event_name, info):
+        if event_name == "connection.connect_tcp.started":
+            state["new_connection"] = True
+
+    request.extensions["trace"] = trace
+    request.extensions["lit1337_connection"] = state
+
+
+async def _on_response(response: httpx.Response):
+    state = response.request.extensions.get("lit1337_connection")
+    if state is None:
+        return
+    _connection_stats["requests"] += 1
+    if state["new_connection"]:
+        _connection_stats["new_connections"] += 1
+    else:
+        _connection_stats["reused_connections"] += 1
+
+
+def _http2_available():
+    if not GITHUB_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        print("[github_client.py] GITHUB_HTTP2 is set but the 'h2' package is not installed, using HTTP/1.1")
+        return False
+
+
+def _build_client():
+    global _client_http2
+    _client_http2 = _http2_available()
+    limits = httpx.Limits(
+        max_connections=GITHUB_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=GITHUB_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=GITHUB_POOL_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(
+        limits=limits,
+        http2=_client_http2,
+        timeout=GITHUB_DEFAULT_TIMEOUT,
+        event_hooks={"request": [_on_request], "response": [_on_response]},
+    )
+
+
+async def init_github_client():
+    """Create the shared GitHub client (called on app startup)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+        print(f"[github_client.py] GitHub client ready (max_connections={GITHUB_POOL_MAX_CONNECTIONS}, "
+              f"keepalive={GITHUB_POOL_MAX_KEEPALIVE}, http2={_client_http2})")
+    return _client
+
+
+async def close_github_client():
+    """Close the shared GitHub client (called on app shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        print("[github_client.py] GitHub client closed")
+
+
+def get_github_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it lazily for scripts that never run the app startup"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+def token_key(access_token: str) -> str:
+    """Hash an access token so the raw value is never used as a cache key"""
+    return hashlib.sha256(access_token.encode("utf-8")).hexdigest()
+
+
+def _conditional_key(key: str, url: str, kwargs: dict):
+    accept = (kwargs.get("headers") or {}).get("Accept", "")
+    return (key, str(httpx.URL(url, params=kwargs.get("params"))), accept)
+
+
+def _with_validators(kwargs: dict, cached: dict) -> dict:
+    headers = dict(kwargs.get("headers") or {})
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    elif cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+    return {**kwargs, "headers": headers}
+
+
+def _remember_response(cache_key, response: httpx.Response):
+    etag = response.headers.get("etag")
+    last_modified = response.headers.get("last-modified")
+    if not etag and not last_modified:
+        return
+    _etag_cache.set(cache_key, {
+        "etag": etag,
+        "last_modified": last_modified,
+        # decoded body only - content-encoding/length would not match it any more
+        "headers": {"content-type": response.headers.get("content-type", "application/json")},
+        "content": response.content,
+    })
+
+
+def _replay_cached(cached: dict, response: httpx.Response) -> httpx.Response:
+    headers = dict(cached["headers"])
+    if cached.get("etag"):
+        headers["etag"] = cached["etag"]
+    return httpx.Response(200, headers=headers, content=cached["content"], request=response.request)
+
+
+async def github_request(method: str, url: str, access_token: str = None, priority: int = PRIORITY_NORMAL,
+                         idempotent: bool = False, **kwargs):
+    """Send a request through the shared client with rate-limit scheduling, retries and the circuit breaker.
+
+    Authenticated GETs are sent with If-None-Match / If-Modified-Since when we
+    hold a cached copy; a 304 (free against the rate limit) is answered from
+    the cache as a normal 200 response. GET/HEAD and calls marked idempotent
+    are retried on transient failures; anything else only when the request
+    never left this process.
+    """
+    client = get_github_client()
+    key = token_key(access_token) if access_token else None
+    retry_safe = idempotent or method.upper() in ("GET", "HEAD")
+
+    cache_key = _conditional_key(key, url, kwargs) if key and method.upper() == "GET" else None
+    cached = _etag_cache.get(cache_key) if cache_key else None
+    if cached:
+        kwargs = _with_validators(kwargs, cached)
+        _etag_stats["conditional_requests"] += 1
+
+    attempt = 1
+    rate_limit_retried = False
+    while True:
+        if key:
+            await scheduler.acquire(key, priority)
+        error = None
+        probing = False
+        try:
+            probing = breaker.before_call()
+            response = await client.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            error = e
+        except BaseException:
+            if probing:
+                breaker.abort_probe()
+            raise
+        finally:
+            if key:
+                scheduler.release(key)
+
+        if error is not None:
+            breaker.record_failure()
+            if not should_retry_error(error, attempt, retry_safe):
+                raise error
+            print(f"[github_client.py] {method} {url} failed ({type(error).__name__}), retry {attempt}")
+            await asyncio.sleep(retry_delay(attempt))
+            attempt += 1
+            continue
+
+        if response.status_code in RETRYABLE_STATUS:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        if key:
+            backoff = scheduler.update(key, response)
+            # One retry after a short Retry-After / secondary limit; acquire() waits it out
+            if backoff and not rate_limit_retried and backoff <= GITHUB_RATELIMIT_MAX_WAIT:
+                rate_limit_retried = True
+                continue
+
+        if should_retry_status(response.status_code, attempt, retry_safe):
+            print(f"[github_client.py] {method} {url} returned {response.status_code}, retry {attempt}")
+            await asyncio.sleep(retry_delay(attempt))
+            attempt += 1
+            continue
+        break
+
+    if cache_key is None:
+        return response
+    if response.status_code == 304 and cached:
+        _etag_stats["not_modified"] += 1
+        return _replay_cached(cached, response)
+    if response.status_code == 200:
+        _remember_response(cache_key, response)
+    elif response.status_code in (401, 404):
+        _etag_cache.delete(cache_key)
+    return response
+
+
+def get_etag_cache_stats():
+    return {**_etag_cache.stats(), **_etag_stats}
+
+
+def get_github_client_stats():
+    stats = dict(_connection_stats)
+    total = stats["new_connections"] + stats["reused_connections"]
+    stats["reuse_ratio"] = round(stats["reused_connections"] / total, 4) if total else 0.0
+    stats["http2"] = _client_http2
+    stats["max_connections"] = GITHUB_POOL_MAX_CONNECTIONS
+    stats["max_keepalive_connections"] = GITHUB_POOL_MAX_KEEPALIVE
+    return stats
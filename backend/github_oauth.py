@@ -1,5 +1,7 @@
 import os
 import httpx
+from github_client import github_request
+from github_auth import AUTH_SCHEMES, get_cached_github_auth, remember_github_auth, invalidate_github_auth
 import logging
 from fastapi import Request, HTTPException
 
@@ -20,76 +22,75 @@ async def exchange_code_for_token(code: str):
 
     """Exchange GitHub OAuth code for token data"""
     try:
-        async with httpx.AsyncClient() as client:
-            print(f"🚀 Exchanging code for token with GitHub...")
-            print(f"Using code: {code[:10]}...")
-            
-            # Log credentials being used (partially obscured for security)
-            print(f"🔑 Using Client ID: {GITHUB_CLIENT_ID[:5]}...")
-            print(f"🔑 Using Client Secret: {GITHUB_CLIENT_SECRET[:5]}...")
-            
-            response = await client.post(
-                "https://github.com/login/oauth/access_token",
-                headers={
-                    "Accept": "application/json"
-                },
-
-                data={
-                    "client_id": GITHUB_CLIENT_ID,
-                    "client_secret": GITHUB_CLIENT_SECRET,
-                    "code": code
-                }
-            )
+        print(f"🚀 Exchanging code for token with GitHub...")
+        print(f"Using code: {code[:10]}...")
+        
+        # Log credentials being used (partially obscured for security)
+        print(f"🔑 Using Client ID: {GITHUB_CLIENT_ID[:5]}...")
+        print(f"🔑 Using Client Secret: {GITHUB_CLIENT_SECRET[:5]}...")
+        
+        response = await github_request(
+            "POST", "https://github.com/login/oauth/access_token",
+            headers={
+                "Accept": "application/json"
+            },
 
-            print(f"✅ GitHub token exchange status: {response.status_code}")
-            print(f"Response headers: {dict(response.headers)}")
-            
-            try:
-                response_text = response.text
-                print(f"Raw response text: {response_text}")
-                data = response.json()
-                print(f"Parsed response data keys: {list(data.keys())}")
-            except Exception as e:
-                print(f"❌ Failed to parse JSON response: {response_text}")
-                raise Exception(f"Failed to parse GitHub response: {str(e)}")
-            
-            if "error" in data:
-                error_description = data.get("error_description", "No description provided")
-                print(f"❌ GitHub OAuth error: {data['error']} - {error_description}")
-                raise Exception(f"GitHub OAuth error: {data['error']} - {error_description}")
-            
-            if "access_token" not in data:
-                print("❌ Access token is missing from response")
-                print(f"Available fields in response: {list(data.keys())}")
-                raise Exception("No access token in GitHub response")
-            
-            # Ensure token is properly stored and formatted
-            access_token = data.get("access_token", "").strip()
-            if not access_token:
-                print("❌ Access token is empty")
-                raise Exception("Empty access token received from GitHub")
-                
-            # Create a new clean data object to avoid any issues
-            token_data = {
-                "access_token": access_token,
-                "token_type": data.get("token_type", "bearer"),
-                "scope": data.get("scope", "")
+            data={
+                "client_id": GITHUB_CLIENT_ID,
+                "client_secret": GITHUB_CLIENT_SECRET,
+                "code": code
             }
-                
-            print(f"🔑 Successfully obtained token data with fields: {list(token_data.keys())}")
-            print(f"🔑 Access token value: {access_token[:10]}...")
-            
-            # Directly log the full token JUST FOR DEBUGGING (would remove in production)
-            print(f"🔑 FULL TOKEN FOR DEBUG: {access_token}")
-            
-            # Verify token data is correctly formed
-            if not token_data.get("access_token"):
-                print("⚠️ WARNING: access_token field is empty or missing in final token_data")
-                # Try once more to ensure it's set
-                token_data["access_token"] = access_token
-            
-            return token_data
-            
+        )
+
+        print(f"✅ GitHub token exchange status: {response.status_code}")
+        print(f"Response headers: {dict(response.headers)}")
+        
+        try:
+            response_text = response.text
+            print(f"Raw response text: {response_text}")
+            data = response.json()
+            print(f"Parsed response data keys: {list(data.keys())}")
+        except Exception as e:
+            print(f"❌ Failed to parse JSON response: {response_text}")
+            raise Exception(f"Failed to parse GitHub response: {str(e)}")
+        
+        if "error" in data:
+            error_description = data.get("error_description", "No description provided")
+            print(f"❌ GitHub OAuth error: {data['error']} - {error_description}")
+            raise Exception(f"GitHub OAuth error: {data['error']} - {error_description}")
+        
+        if "access_token" not in data:
+            print("❌ Access token is missing from response")
+            print(f"Available fields in response: {list(data.keys())}")
+            raise Exception("No access token in GitHub response")
+        
+        # Ensure token is properly stored and formatted
+        access_token = data.get("access_token", "").strip()
+        if not access_token:
+            print("❌ Access token is empty")
+            raise Exception("Empty access token received from GitHub")
+            
+        # Create a new clean data object to avoid any issues
+        token_data = {
+            "access_token": access_token,
+            "token_type": data.get("token_type", "bearer"),
+            "scope": data.get("scope", "")
+        }
+            
+        print(f"🔑 Successfully obtained token data with fields: {list(token_data.keys())}")
+        print(f"🔑 Access token value: {access_token[:10]}...")
+        
+        # Directly log the full token JUST FOR DEBUGGING (would remove in production)
+        print(f"🔑 FULL TOKEN FOR DEBUG: {access_token}")
+        
+        # Verify token data is correctly formed
+        if not token_data.get("access_token"):
+            print("⚠️ WARNING: access_token field is empty or missing in final token_data")
+            # Try once more to ensure it's set
+            token_data["access_token"] = access_token
+        
+        return token_data
+        
     except Exception as e:
         print(f"🔥 Error in token exchange: {str(e)}")
         raise
@@ -97,47 +98,44 @@ async def exchange_code_for_token(code: str):
 async def get_user_info(access_token: str):
     """Get GitHub user information using access token"""
     try:
-        async with httpx.AsyncClient() as client:
-            print(f"👤 Fetching user info from GitHub...")
-            print(f"👤 Using token: {access_token[:10]}...")
-            
-            # Try both authentication methods
+        print(f"👤 Fetching user info from GitHub...")
+        print(f"👤 Using token: {access_token[:10]}...")
+        
+        # Start with the scheme we already know works for this token, if any
+        cached = await get_cached_github_auth(access_token)
+        schemes = [cached["scheme"]] if cached else []
+        schemes += [scheme for scheme in AUTH_SCHEMES if scheme not in schemes]
+        
+        for scheme in schemes:
             headers = {
-                "Authorization": f"token {access_token}",  # GitHub preferred format
+                "Authorization": f"{scheme} {access_token}",
                 "Accept": "application/vnd.github.v3+json",
                 "User-Agent": "LIT1337-App"
             }
             
-            response = await client.get(
-                "https://api.github.com/user",
+            response = await github_request(
+                "GET", "https://api.github.com/user",
+                access_token=access_token,
                 headers=headers
             )
-            
-            if response.status_code != 200:
-                # Try alternative Bearer format if token format fails
-                print(f"First attempt failed with status {response.status_code}, trying Bearer format")
-                alt_headers = {
-                    "Authorization": f"Bearer {access_token}",  # OAuth standard
-                    "Accept": "application/vnd.github.v3+json",
-                    "User-Agent": "LIT1337-App"
-                }
-                
-                response = await client.get(
-                    "https://api.github.com/user",
-                    headers=alt_headers
-                )
-            
-            print(f"GitHub API response status: {response.status_code}")
-            
-            if response.status_code != 200:
-                error_data = response.json()
-                print(f"❌ GitHub API error response: {error_data}")
-                raise Exception(f"GitHub API error: {response.status_code} - {error_data.get('message', 'Unknown error')}")
-            
-            data = response.json()
-            print(f"✅ GitHub user info received for: {data.get('login')}")
-            return data
-            
+            if response.status_code == 200:
+                await remember_github_auth(access_token, scheme, response.json().get("login"))
+                break
+            # Cached scheme no longer valid (e.g. 401), drop it and keep probing
+            await invalidate_github_auth(access_token)
+            print(f"Attempt with '{scheme}' prefix failed with status {response.status_code}")
+        
+        print(f"GitHub API response status: {response.status_code}")
+        
+        if response.status_code != 200:
+            error_data = response.json()
+            print(f"❌ GitHub API error response: {error_data}")
+            raise Exception(f"GitHub API error: {response.status_code} - {error_data.get('message', 'Unknown error')}")
+        
+        data = response.json()
+        print(f"✅ GitHub user info received for: {data.get('login')}")
+        return data
+        
     except Exception as e:
         print(f"❌ Error getting user info: {str(e)}")
         raise
\ No newline at end of file
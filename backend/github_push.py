@@ -1,4 +1,11 @@
+import os
+import asyncio
 import httpx
+from github_client import github_request
+from github_ratelimit import PRIORITY_HIGH, PRIORITY_LOW, LowPrioritySkipped
+from github_auth import resolve_github_auth, github_headers, invalidate_github_auth, token_key
+from utils.cache_backend import get_cache
+from repo_index import get_repo_index, git_blob_sha, head_is_current, record_pushed_file, record_commit, invalidate_repo_index
 from datetime import datetime
 import base64
 from fastapi import HTTPException
@@ -7,8 +14,53 @@ import traceback
 
 GITHUB_API_URL = "https://api.github.com"
 
+GITHUB_REPO_CACHE_TTL = float(os.getenv("GITHUB_REPO_CACHE_TTL", "600"))
+GITHUB_REPO_NEGATIVE_CACHE_TTL = float(os.getenv("GITHUB_REPO_NEGATIVE_CACHE_TTL", "30"))
+
+_repo_exists_cache = get_cache("repo_exists", maxsize=int(os.getenv("GITHUB_REPO_CACHE_SIZE", "4096")), ttl=GITHUB_REPO_CACHE_TTL)
+_default_branch_cache = get_cache("default_branch", maxsize=int(os.getenv("GITHUB_REPO_CACHE_SIZE", "4096")), ttl=GITHUB_REPO_CACHE_TTL)
+
+def _repo_cache_key(access_token: str, repo: str):
+    return (token_key(access_token), repo.lower())
+
+
+async def invalidate_repo_exists(access_token: str, repo: str):
+    """Drop the cached existence result for a repository"""
+    await _repo_exists_cache.delete(_repo_cache_key(access_token, repo))
+
+
+def get_repo_exists_cache_stats():
+    return _repo_exists_cache.stats()
+
+
 async def repo_exists(access_token: str, repo: str):
-    """Check if a repository exists and is accessible to the user"""
+    """Check if a repository exists and is accessible to the user (cached per token and repo)"""
+    if not repo or '/' not in repo:
+        print(f"[github_push.py] Invalid repository format: {repo}")
+        return False
+
+    key = _repo_cache_key(access_token, repo)
+    cached = await _repo_exists_cache.get(key)
+    if cached is not None:
+        print(f"[github_push.py] Repository existence cache hit for {repo}: {cached}")
+        return cached
+
+    try:
+        exists = await _check_repo_exists(access_token, repo)
+    except LowPrioritySkipped:
+        # Quota is down to the write reserve: don't spend it on the probe, let the
+        # write itself report a missing repository (404) - and don't cache the guess
+        print(f"[github_push.py] Skipping existence check for {repo}, GitHub quota is reserved for writes")
+        return True
+    if exists is None:
+        # Indeterminate (auth or transport problem) - don't cache, report as not accessible
+        return False
+    await _repo_exists_cache.set(key, exists, ttl=GITHUB_REPO_CACHE_TTL if exists else GITHUB_REPO_NEGATIVE_CACHE_TTL)
+    return exists
+
+
+async def _check_repo_exists(access_token: str, repo: str):
+    """Ask GitHub whether a repository exists; returns None when the answer is indeterminate"""
     print(f"[github_push.py] Checking if repository exists: {repo}")
     print(f"[github_push.py] Access token (first 10 chars): {access_token[:10]}...")
     
@@ -26,140 +78,108 @@ async def repo_exists(access_token: str, repo: str):
         print(f"[github_push.py] Invalid repository format (couldn't split): {repo}")
         return False
         
-    # First, verify user authentication
-    # Try both token formats (GitHub supports 'token' prefix and 'Bearer' prefix)
-    headers1 = {
-        "Authorization": f"token {access_token}",  # GitHub's preferred format
-        "Accept": "application/vnd.github+json",
-        "User-Agent": "LIT1337-App/1.0",
-        "X-GitHub-Api-Version": "2022-11-28"
-    }
-    
-    headers2 = {
-        "Authorization": f"Bearer {access_token}",  # OAuth standard
-        "Accept": "application/vnd.github+json",
-        "User-Agent": "LIT1337-App/1.0",
-        "X-GitHub-Api-Version": "2022-11-28"
-    }
-    
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            # First try the token prefix format
-            print(f"[github_push.py] First attempt with 'token' prefix")
-            user_url = f"{GITHUB_API_URL}/user"
-            user_res = await client.get(user_url, headers=headers1)
+        # Resolve which auth scheme works for this token (cached after the first probe)
+        try:
+            auth = await resolve_github_auth(access_token)
+        except HTTPException as e:
+            print(f"[github_push.py] Authentication failed: {e.status_code} - {e.detail}")
+            return None
+        headers = auth["headers"]
             
-            if user_res.status_code != 200:
-                print(f"[github_push.py] First attempt failed with status {user_res.status_code}, trying Bearer format")
-                # Try Bearer format if token format fails
-                user_res = await client.get(user_url, headers=headers2)
-                
-                if user_res.status_code != 200:
-                    print(f"[github_push.py] Both authentication attempts failed: {user_res.status_code} - {user_res.text}")
-                    if user_res.status_code == 401:
-                        raise HTTPException(status_code=401, detail="GitHub authentication failed - token might be invalid or expired")
-                    return False
-                else:
-                    # Bearer format worked, use these headers
-                    print(f"[github_push.py] Bearer format worked. Using Bearer prefix for future requests.")
-                    headers = headers2
-            else:
-                # Token format worked, use these headers
-                print(f"[github_push.py] Token format worked. Using token prefix for future requests.")
-                headers = headers1
-                
-            # Get authenticated username to verify repo access permissions
-            username = user_res.json().get("login")
-            if not username:
-                print("[github_push.py] Could not get authenticated username")
-                return False
-                
-            print(f"[github_push.py] Authenticated as: {username}")
+        # Get authenticated username to verify repo access permissions
+        username = auth["login"]
+        if not username:
+            print("[github_push.py] Could not get authenticated username")
+            return None
             
-            # Try to get the repository directly
-            repo_url = f"{GITHUB_API_URL}/repos/{repo}"
-            print(f"[github_push.py] Checking repository URL: {repo_url}")
+        print(f"[github_push.py] Authenticated as: {username}")
+        
+        # Try to get the repository directly
+        repo_url = f"{GITHUB_API_URL}/repos/{repo}"
+        print(f"[github_push.py] Checking repository URL: {repo_url}")
+        
+        repo_res = await github_request("GET", repo_url, access_token=access_token, priority=PRIORITY_LOW, headers=headers, timeout=15.0)
+        
+        # Log detailed info for debugging
+        print(f"[github_push.py] Repo check status: {repo_res.status_code}")
+        if repo_res.status_code != 200:
+            print(f"[github_push.py] Repo check failed: {repo_res.status_code}")
+            if repo_res.status_code == 401:
+                await invalidate_github_auth(access_token)
+            try:
+                error_json = repo_res.json()
+                print(f"[github_push.py] Error details: {error_json}")
+            except:
+                print(f"[github_push.py] Error text: {repo_res.text}")
+        
+        # Repository exists and is accessible if status code is 200
+        if repo_res.status_code == 200:
+            print(f"[github_push.py] Repository {repo} exists and is accessible")
+            return True
             
-            repo_res = await client.get(repo_url, headers=headers)
+        # Handle specific error cases
+        if repo_res.status_code == 404:
+            print(f"[github_push.py] Repository not found: {repo}")
             
-            # Log detailed info for debugging
-            print(f"[github_push.py] Repo check status: {repo_res.status_code}")
-            if repo_res.status_code != 200:
-                print(f"[github_push.py] Repo check failed: {repo_res.status_code}")
-                try:
-                    error_json = repo_res.json()
-                    print(f"[github_push.py] Error details: {error_json}")
-                except:
-                    print(f"[github_push.py] Error text: {repo_res.text}")
+            # Try checking if owner exists
+            user_profile_url = f"{GITHUB_API_URL}/users/{owner}"
+            user_profile_res = await github_request("GET", user_profile_url, access_token=access_token, priority=PRIORITY_LOW, headers=headers, timeout=15.0)
             
-            # Repository exists and is accessible if status code is 200
-            if repo_res.status_code == 200:
-                print(f"[github_push.py] Repository {repo} exists and is accessible")
-                return True
+            if user_profile_res.status_code != 200:
+                print(f"[github_push.py] GitHub user '{owner}' may not exist")
+                return False
                 
-            # Handle specific error cases
-            if repo_res.status_code == 404:
-                print(f"[github_push.py] Repository not found: {repo}")
+            # If owner exists, check if repo might be private
+            if owner != username:
+                print(f"[github_push.py] Repository owner {owner} is not the authenticated user {username}")
                 
-                # Try checking if owner exists
-                user_profile_url = f"{GITHUB_API_URL}/users/{owner}"
-                user_profile_res = await client.get(user_profile_url, headers=headers)
+                # List public repos for this owner
+                user_repos_url = f"{GITHUB_API_URL}/users/{owner}/repos?per_page=100"
+                user_repos_res = await github_request("GET", user_repos_url, access_token=access_token, priority=PRIORITY_LOW, headers=headers, timeout=15.0)
                 
-                if user_profile_res.status_code != 200:
-                    print(f"[github_push.py] GitHub user '{owner}' may not exist")
-                    return False
+                if user_repos_res.status_code == 200:
+                    repos = user_repos_res.json()
+                    repo_names = [r.get("name") for r in repos if r.get("name")]
                     
-                # If owner exists, check if repo might be private
-                if owner != username:
-                    print(f"[github_push.py] Repository owner {owner} is not the authenticated user {username}")
-                    
-                    # List public repos for this owner
-                    user_repos_url = f"{GITHUB_API_URL}/users/{owner}/repos?per_page=100"
-                    user_repos_res = await client.get(user_repos_url, headers=headers)
-                    
-                    if user_repos_res.status_code == 200:
-                        repos = user_repos_res.json()
-                        repo_names = [r.get("name") for r in repos if r.get("name")]
-                        
-                        if repo_names and name not in repo_names:
-                            print(f"[github_push.py] Repository '{name}' not found in public repos of user '{owner}'")
-                            print(f"[github_push.py] Available repos: {repo_names[:5]}")
-                        else:
-                            print(f"[github_push.py] Repository exists but may be private")
-                            
-                        # Try to fetch the exact repository info directly
-                        specific_repo_url = f"{GITHUB_API_URL}/repos/{owner}/{name}"
-                        specific_repo_res = await client.get(specific_repo_url, headers=headers)
+                    if repo_names and name not in repo_names:
+                        print(f"[github_push.py] Repository '{name}' not found in public repos of user '{owner}'")
+                        print(f"[github_push.py] Available repos: {repo_names[:5]}")
+                    else:
+                        print(f"[github_push.py] Repository exists but may be private")
                         
-                        if specific_repo_res.status_code == 200:
-                            print(f"[github_push.py] Direct repository check succeeded!")
-                            return True
-                        else:
-                            print(f"[github_push.py] Direct repository check failed: {specific_repo_res.status_code}")
-                
-                return False
-                
-            else:
-                print(f"[github_push.py] GitHub API error: {repo_res.status_code} - {repo_res.text}")
-                return False
-                
+                    # Try to fetch the exact repository info directly
+                    specific_repo_url = f"{GITHUB_API_URL}/repos/{owner}/{name}"
+                    specific_repo_res = await github_request("GET", specific_repo_url, access_token=access_token, priority=PRIORITY_LOW, headers=headers, timeout=15.0)
+                    
+                    if specific_repo_res.status_code == 200:
+                        print(f"[github_push.py] Direct repository check succeeded!")
+                        return True
+                    else:
+                        print(f"[github_push.py] Direct repository check failed: {specific_repo_res.status_code}")
+            
+            return False
+            
+        else:
+            print(f"[github_push.py] GitHub API error: {repo_res.status_code} - {repo_res.text}")
+            return None
+            
     except httpx.RequestError as e:
         print(f"[github_push.py] Request error checking repository: {str(e)}")
-        return False
+        return None
+    except HTTPException:
+        # Rate limited beyond what we are willing to wait - surface it instead of "not found"
+        raise
     except Exception as e:
         print(f"[github_push.py] Unexpected error checking repository: {str(e)}")
         print(traceback.format_exc())
-        return False
+        return None
 
 async def create_repo(access_token: str, repo_name: str):
     """Create a new repository for the authenticated user"""
     print(f"Creating new repository: {repo_name}")
     url = f"{GITHUB_API_URL}/user/repos"
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28"
-    }
+    headers = await github_headers(access_token)
     json = {
         "name": repo_name,
         "description": "LeetCode solutions pushed by LeetCode Pusher",
@@ -168,81 +188,122 @@ async def create_repo(access_token: str, repo_name: str):
     }
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            res = await client.post(url, headers=headers, json=json)
+        res = await github_request("POST", url, access_token=access_token, priority=PRIORITY_HIGH, headers=headers, json=json, timeout=30.0)
+        
+        if res.status_code == 201:
+            print(f"Repository created successfully: {repo_name}")
+            # The repo may have been cached as missing a moment ago
+            full_name = res.json().get("full_name")
+            if full_name:
+                await invalidate_repo_exists(access_token, full_name)
+            return True
+        else:
+            error_message = f"Failed to create repository: {res.status_code}"
+            try:
+                error_json = res.json()
+                if "message" in error_json:
+                    error_message = f"GitHub error: {error_json['message']}"
+            except Exception:
+                error_message = f"GitHub returned status {res.status_code}: {res.text}"
             
-            if res.status_code == 201:
-                print(f"Repository created successfully: {repo_name}")
-                return True
-            else:
-                error_message = f"Failed to create repository: {res.status_code}"
-                try:
-                    error_json = res.json()
-                    if "message" in error_json:
-                        error_message = f"GitHub error: {error_json['message']}"
-                except Exception:
-                    error_message = f"GitHub returned status {res.status_code}: {res.text}"
-                
-                print(error_message)
-                return False
+            print(error_message)
+            if res.status_code == 401:
+                await invalidate_github_auth(access_token)
+            return False
     except Exception as e:
         print(f"Error creating repository: {str(e)}")
         return False
 
 async def get_existing_file_sha(access_token: str, repo: str, path: str):
     url = f"{GITHUB_API_URL}/repos/{repo}/contents/{path}"
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28"
-    }
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        res = await client.get(url, headers=headers)
-        if res.status_code == 200:
-            data = res.json()
-            return data.get("sha")
-        return None
+    headers = await github_headers(access_token)
+    res = await github_request("GET", url, access_token=access_token, headers=headers, timeout=10.0)
+    if res.status_code == 200:
+        data = res.json()
+        return data.get("sha")
+    if res.status_code == 401:
+        await invalidate_github_auth(access_token)
+    return None
 
 async def get_existing_file_content(access_token: str, repo: str, path: str):
     url = f"{GITHUB_API_URL}/repos/{repo}/contents/{path}"
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28"
-    }
+    headers = await github_headers(access_token)
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            res = await client.get(url, headers=headers)
-            if res.status_code == 200:
-                data = res.json()
-                return base64.b64decode(data.get("content")).decode('utf-8'), data.get("sha")
-            return None, None
+        res = await github_request("GET", url, access_token=access_token, headers=headers, timeout=10.0)
+        if res.status_code == 200:
+            data = res.json()
+            return base64.b64decode(data.get("content")).decode('utf-8'), data.get("sha")
+        if res.status_code == 401:
+            await invalidate_github_auth(access_token)
+        return None, None
     except Exception as e:
         print(f"Error getting file content: {str(e)}")
         return None, None
 
 
+async def _contents_api_payload(headers, access_token: str, url: str, repo: str, filename: str, content: str, encoded_content: str):
+    """Build the PUT payload by asking the Contents API for the current file; returns None if unchanged"""
+    # Check if file exists first
+    print(f"[github_push.py] Checking if file exists: {url}")
+    existing_file = await github_request("GET", url, access_token=access_token, headers=headers, timeout=30.0)
+    
+    # Handle status codes explicitly
+    if existing_file.status_code == 200:
+        # File exists, get its content and SHA
+        existing_data = existing_file.json()
+        
+        try:
+            existing_content = base64.b64decode(existing_data["content"]).decode('utf-8')
+            
+            if existing_content.strip() == content.strip():
+                print("[github_push.py] File content unchanged")
+                return None
+        except Exception as e:
+            print(f"[github_push.py] Error decoding existing content: {str(e)}")
+        
+        payload = {
+            "message": f"Update LeetCode solution: {filename}",
+            "content": encoded_content,
+            "sha": existing_data["sha"]
+        }
+        print(f"[github_push.py] Updating existing file {filename} in {repo}")
+        
+    elif existing_file.status_code == 404:
+        # File doesn't exist, create new file
+        # This is an expected case - create a new file
+        payload = {
+            "message": f"Add LeetCode solution: {filename}",
+            "content": encoded_content
+        }
+        print(f"[github_push.py] Creating new file {filename} in {repo}")
+    else:
+        # For other unexpected status codes, return the error
+        error_text = existing_file.text
+        print(f"[github_push.py] Unexpected status checking file: {existing_file.status_code} - {error_text}")
+        if existing_file.status_code == 401:
+            await invalidate_github_auth(access_token)
+        
+        # Parse response as JSON if possible
+        try:
+            error_json = existing_file.json()
+            error_detail = error_json.get("message", error_text)
+        except:
+            error_detail = error_text
+            
+        # Return the actual status code directly
+        raise HTTPException(
+            status_code=existing_file.status_code, 
+            detail=f"GitHub API error: {error_detail}"
+        )
+    return payload
+
+
 async def push_code_to_github(access_token: str, repo: str, filename: str, content: str):
     try:
         # Log request info (without sensitive data)
         print(f"[github_push.py] Pushing to GitHub repo: {repo}, file: {filename}, content length: {len(content)}")
         print(f"[github_push.py] Access token (first 10 chars): {access_token[:10]}...")
         
-        # Try both token formats (GitHub supports 'token' prefix and 'Bearer' prefix)
-        headers1 = {
-            "Authorization": f"token {access_token}",  # GitHub's preferred format
-            "Accept": "application/vnd.github+json",
-            "User-Agent": "LIT1337-App/1.0",
-            "X-GitHub-Api-Version": "2022-11-28"
-        }
-        
-        headers2 = {
-            "Authorization": f"Bearer {access_token}",  # OAuth standard
-            "Accept": "application/vnd.github+json",
-            "User-Agent": "LIT1337-App/1.0",
-            "X-GitHub-Api-Version": "2022-11-28"
-        }
-        
         # Ensure repo format is correct (username/repo)
         if '/' not in repo:
             error_msg = f"Invalid repository format: {repo}. Should be 'username/repo'"
@@ -263,130 +324,105 @@ async def push_code_to_github(access_token: str, repo: str, filename: str, conte
             
         # Verify user authentication and determine which header format works
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                # First try the token prefix format
-                print(f"[github_push.py] Auth test - first attempt with 'token' prefix")
-                user_url = f"{GITHUB_API_URL}/user"
-                user_res = await client.get(user_url, headers=headers1)
-                
-                if user_res.status_code != 200:
-                    print(f"[github_push.py] Auth test - first attempt failed with status {user_res.status_code}, trying Bearer format")
-                    # Try Bearer format if token format fails
-                    user_res = await client.get(user_url, headers=headers2)
-                    
-                    if user_res.status_code != 200:
-                        print(f"[github_push.py] Auth test - both authentication attempts failed: {user_res.status_code} - {user_res.text}")
-                        if user_res.status_code == 401:
-                            raise HTTPException(status_code=401, detail="GitHub authentication failed - token might be invalid or expired")
-                        raise HTTPException(status_code=user_res.status_code, detail=f"GitHub API error: {user_res.text}")
-                    else:
-                        # Bearer format worked, use these headers
-                        print(f"[github_push.py] Auth test - Bearer format worked. Using Bearer prefix for future requests.")
-                        headers = headers2
-                else:
-                    # Token format worked, use these headers
-                    print(f"[github_push.py] Auth test - Token format worked. Using token prefix for future requests.")
-                    headers = headers1
-                    
-                # Authentication succeeded, we now have a working headers object
-                print(f"[github_push.py] Authentication successful")
-                
-                # Get authenticated username
-                username = user_res.json().get("login")
-                print(f"[github_push.py] Authenticated as: {username}")
-                
-                # Extra validation check for the repository before proceeding
-                repo_exists_check = await repo_exists(access_token, repo)
-                if not repo_exists_check:
-                    error_msg = f"Repository '{repo}' not found or not accessible. Please check if it exists and you have permissions."
-                    print(f"[github_push.py] {error_msg}")
-                    # Return 404 directly to ensure proper error propagation
-                    raise HTTPException(status_code=404, detail=error_msg)
-                    
-                # URL for GitHub API
-                url = f"{GITHUB_API_URL}/repos/{repo}/contents/{filename}"
-                print(f"[github_push.py] GitHub API URL: {url}")
+            # Resolve the working auth scheme; only the first push for a token probes GET /user
+            auth = await resolve_github_auth(access_token)
+            headers = auth["headers"]
+            print(f"[github_push.py] Authenticated as: {auth['login']} (scheme: {auth['scheme']})")
             
-                # Encode content properly
-                try:
-                    encoded_content = base64.b64encode(content.encode('utf-8')).decode('utf-8')
-                except Exception as e:
-                    print(f"[github_push.py] Content encoding error: {str(e)}")
-                    raise HTTPException(status_code=400, detail=f"Failed to encode content: {str(e)}")
-                
-                # Check if file exists first
-                print(f"[github_push.py] Checking if file exists: {url}")
-                client.timeout = 30.0  # 30 seconds timeout
-                existing_file = await client.get(url, headers=headers)
-                
-                # Handle status codes explicitly
-                if existing_file.status_code == 200:
-                    # File exists, get its content and SHA
-                    existing_data = existing_file.json()
-                    
-                    try:
-                        existing_content = base64.b64decode(existing_data["content"]).decode('utf-8')
-                        
-                        if existing_content.strip() == content.strip():
-                            print("[github_push.py] File content unchanged")
-                            return 200, {"message": "No change"}
-                    except Exception as e:
-                        print(f"[github_push.py] Error decoding existing content: {str(e)}")
-                    
-                    payload = {
-                        "message": f"Update LeetCode solution: {filename}",
-                        "content": encoded_content,
-                        "sha": existing_data["sha"]
-                    }
-                    print(f"[github_push.py] Updating existing file {filename} in {repo}")
-                    
-                elif existing_file.status_code == 404:
-                    # File doesn't exist, create new file
-                    # This is an expected case - create a new file
-                    payload = {
-                        "message": f"Add LeetCode solution: {filename}",
-                        "content": encoded_content
-                    }
-                    print(f"[github_push.py] Creating new file {filename} in {repo}")
-                else:
-                    # For other unexpected status codes, return the error
-                    error_text = existing_file.text
-                    print(f"[github_push.py] Unexpected status checking file: {existing_file.status_code} - {error_text}")
-                    
-                    # Parse response as JSON if possible
-                    try:
-                        error_json = existing_file.json()
-                        error_detail = error_json.get("message", error_text)
-                    except:
-                        error_detail = error_text
-                        
-                    # Return the actual status code directly
-                    raise HTTPException(
-                        status_code=existing_file.status_code, 
-                        detail=f"GitHub API error: {error_detail}"
-                    )
-                
-                # Push to GitHub
-                print(f"[github_push.py] Sending PUT request to GitHub API")
-                response = await client.put(url, headers=headers, json=payload)
+            # Extra validation check for the repository before proceeding
+            repo_exists_check = await repo_exists(access_token, repo)
+            if not repo_exists_check:
+                error_msg = f"Repository '{repo}' not found or not accessible. Please check if it exists and you have permissions."
+                print(f"[github_push.py] {error_msg}")
+                # Return 404 directly to ensure proper error propagation
+                raise HTTPException(status_code=404, detail=error_msg)
                 
-                print(f"[github_push.py] GitHub API response: {response.status_code}")
-                if response.status_code in [200, 201]:
-                    result = response.json()
-                    print(f"[github_push.py] Successfully pushed file!")
-                    return response.status_code, result
-                else:
-                    error_text = response.text
-                    print(f"[github_push.py] GitHub API error: {response.status_code} - {error_text}")
-                    
-                    # Parse response as JSON if possible
-                    try:
-                        error_json = response.json()
-                        # Preserve the actual status code
-                        return response.status_code, error_json
-                    except:
-                        return response.status_code, {"message": f"GitHub API error: {error_text}"}
+            # URL for GitHub API
+            url = f"{GITHUB_API_URL}/repos/{repo}/contents/{filename}"
+            print(f"[github_push.py] GitHub API URL: {url}")
+            
+            # Encode content properly
+            try:
+                encoded_content = base64.b64encode(content.encode('utf-8')).decode('utf-8')
+            except Exception as e:
+                print(f"[github_push.py] Content encoding error: {str(e)}")
+                raise HTTPException(status_code=400, detail=f"Failed to encode content: {str(e)}")
+            
+            # Answer existence / "already pushed" from the repository tree snapshot
+            # when we have one; fall back to a Contents API GET otherwise
+            index = await get_repo_index(access_token, repo)
+            indexed_sha = index["paths"].get(filename) if index else None
+            from_index = True
+            unchanged = indexed_sha is not None and indexed_sha == git_blob_sha(content)
+            if unchanged and await head_is_current(access_token, repo, index):
+                print("[github_push.py] File content unchanged (tree index)")
+                return 200, {"message": "No change"}
+            if unchanged:
+                # The snapshot may be stale (edited on github.com, pushed from another
+                # worker) or the head could not be checked - ask the Contents API
+                from_index = False
+                payload = await _contents_api_payload(headers, access_token, url, repo, filename, content, encoded_content)
+                if payload is None:
+                    return 200, {"message": "No change"}
+            elif indexed_sha is not None:
+                payload = {
+                    "message": f"Update LeetCode solution: {filename}",
+                    "content": encoded_content,
+                    "sha": indexed_sha
+                }
+                print(f"[github_push.py] Updating existing file {filename} in {repo} (tree index)")
+            elif index is not None and index["complete"]:
+                payload = {
+                    "message": f"Add LeetCode solution: {filename}",
+                    "content": encoded_content
+                }
+                print(f"[github_push.py] Creating new file {filename} in {repo} (tree index)")
+            else:
+                from_index = False
+                payload = await _contents_api_payload(headers, access_token, url, repo, filename, content, encoded_content)
+                if payload is None:
+                    return 200, {"message": "No change"}
+            
+            # Push to GitHub. Only an update (with sha) is safe to resend: if a create
+            # went through but its response was lost, the retry would get a 422
+            print(f"[github_push.py] Sending PUT request to GitHub API")
+            response = await github_request(
+                "PUT", url, access_token=access_token, priority=PRIORITY_HIGH, idempotent="sha" in payload,
+                headers=headers, json=payload, timeout=30.0
+            )
+            
+            if from_index and response.status_code in [409, 422]:
+                # Snapshot was stale (repo changed outside LIT1337) - reload lazily and retry via Contents API
+                print(f"[github_push.py] Tree index stale for {repo} ({response.status_code}), retrying via Contents API")
+                invalidate_repo_index(access_token, repo)
+                payload = await _contents_api_payload(headers, access_token, url, repo, filename, content, encoded_content)
+                if payload is None:
+                    return 200, {"message": "No change"}
+                response = await github_request(
+                    "PUT", url, access_token=access_token, priority=PRIORITY_HIGH, idempotent="sha" in payload,
+                    headers=headers, json=payload, timeout=30.0
+                )
+            
+            print(f"[github_push.py] GitHub API response: {response.status_code}")
+            if response.status_code in [200, 201]:
+                result = response.json()
+                print(f"[github_push.py] Successfully pushed file!")
+                record_pushed_file(access_token, repo, result)
+                return response.status_code, result
+            else:
+                error_text = response.text
+                print(f"[github_push.py] GitHub API error: {response.status_code} - {error_text}")
+                if response.status_code == 401:
+                    await invalidate_github_auth(access_token)
                 
+                # Parse response as JSON if possible
+                try:
+                    error_json = response.json()
+                    # Preserve the actual status code
+                    return response.status_code, error_json
+                except:
+                    return response.status_code, {"message": f"GitHub API error: {error_text}"}
+            
         except httpx.HTTPStatusError as e:
             print(f"[github_push.py] HTTP error: {e.response.status_code} - {e.response.text}")
             
@@ -430,6 +466,161 @@ async def push_code_to_github(access_token: str, repo: str, filename: str, conte
         else:
             raise HTTPException(status_code=500, detail=f"Failed to push code: {str(e)}")
 
+def _github_error(res, action: str):
+    """HTTPException carrying GitHub's status and message for a failed call"""
+    try:
+        detail = res.json().get("message", res.text)
+    except Exception:
+        detail = res.text
+    print(f"[github_push.py] {action} failed: {res.status_code} - {detail}")
+    return HTTPException(status_code=res.status_code, detail=f"GitHub API error ({action}): {detail}")
+
+
+async def get_default_branch(access_token: str, repo: str):
+    key = _repo_cache_key(access_token, repo)
+    branch = await _default_branch_cache.get(key)
+    if branch:
+        return branch
+    headers = await github_headers(access_token)
+    res = await github_request("GET", f"{GITHUB_API_URL}/repos/{repo}", access_token=access_token, headers=headers, timeout=15.0)
+    if res.status_code != 200:
+        if res.status_code == 401:
+            await invalidate_github_auth(access_token)
+        raise _github_error(res, "get repository")
+    branch = res.json().get("default_branch") or "main"
+    await _default_branch_cache.set(key, branch)
+    return branch
+
+
+async def _create_blob(access_token: str, headers, repo: str, content: str):
+    res = await github_request(
+        "POST", f"{GITHUB_API_URL}/repos/{repo}/git/blobs",
+        access_token=access_token, priority=PRIORITY_HIGH, idempotent=True,
+        headers=headers,
+        json={"content": base64.b64encode(content.encode('utf-8')).decode('utf-8'), "encoding": "base64"},
+        timeout=30.0
+    )
+    if res.status_code != 201:
+        raise _github_error(res, "create blob")
+    return res.json()["sha"]
+
+
+async def push_files_to_github(access_token: str, repo: str, files: dict, message: str = None):
+    """Push several files (path -> content) as one commit via blobs -> tree -> commit -> ref update"""
+    if not files:
+        raise HTTPException(status_code=400, detail="No files to push")
+    if '/' not in repo or not all(repo.split('/', 1)):
+        raise HTTPException(status_code=400, detail=f"Invalid repository format: {repo}. Should be 'username/repo'")
+
+    print(f"[github_push.py] Batch pushing {len(files)} files to {repo}")
+    try:
+        auth = await resolve_github_auth(access_token)
+        headers = auth["headers"]
+
+        if not await repo_exists(access_token, repo):
+            raise HTTPException(
+                status_code=404,
+                detail=f"Repository '{repo}' not found or not accessible. Please check if it exists and you have permissions."
+            )
+
+        # Drop files the tree snapshot says are already identical in the repo,
+        # as long as the snapshot is still at the branch head
+        index = await get_repo_index(access_token, repo)
+        if index and await head_is_current(access_token, repo, index):
+            files = {path: content for path, content in files.items() if index["paths"].get(path) != git_blob_sha(content)}
+            if not files:
+                print("[github_push.py] All files unchanged (tree index)")
+                return 200, {"message": "No change"}
+
+        branch = await get_default_branch(access_token, repo)
+
+        # Blobs don't depend on the head commit, so create them all at once
+        paths = list(files.keys())
+        blob_shas = await asyncio.gather(*[_create_blob(access_token, headers, repo, files[path]) for path in paths])
+        blobs = dict(zip(paths, blob_shas))
+
+        if message is None:
+            message = f"Add LeetCode solution: {paths[0]}" if len(paths) == 1 else f"Add LeetCode solutions ({len(paths)} files)"
+
+        # Retry once if another writer moved the branch between reading the ref and updating it
+        for attempt in range(2):
+            ref_res = await github_request(
+                "GET", f"{GITHUB_API_URL}/repos/{repo}/git/ref/heads/{branch}",
+                access_token=access_token, priority=PRIORITY_HIGH, headers=headers, timeout=15.0
+            )
+            if ref_res.status_code != 200:
+                raise _github_error(ref_res, "get branch ref")
+            parent_sha = ref_res.json()["object"]["sha"]
+
+            parent_res = await github_request(
+                "GET", f"{GITHUB_API_URL}/repos/{repo}/git/commits/{parent_sha}",
+                access_token=access_token, priority=PRIORITY_HIGH, headers=headers, timeout=15.0
+            )
+            if parent_res.status_code != 200:
+                raise _github_error(parent_res, "get head commit")
+            base_tree = parent_res.json()["tree"]["sha"]
+
+            tree_res = await github_request(
+                "POST", f"{GITHUB_API_URL}/repos/{repo}/git/trees",
+                access_token=access_token, priority=PRIORITY_HIGH, idempotent=True,
+                headers=headers,
+                json={
+                    "base_tree": base_tree,
+                    "tree": [{"path": path, "mode": "100644", "type": "blob", "sha": sha} for path, sha in blobs.items()]
+                },
+                timeout=30.0
+            )
+            if tree_res.status_code != 201:
+                raise _github_error(tree_res, "create tree")
+
+            commit_res = await github_request(
+                "POST", f"{GITHUB_API_URL}/repos/{repo}/git/commits",
+                access_token=access_token, priority=PRIORITY_HIGH,
+                headers=headers,
+                json={"message": message, "tree": tree_res.json()["sha"], "parents": [parent_sha]},
+                timeout=30.0
+            )
+            if commit_res.status_code != 201:
+                raise _github_error(commit_res, "create commit")
+            commit = commit_res.json()
+
+            update_res = await github_request(
+                "PATCH", f"{GITHUB_API_URL}/repos/{repo}/git/refs/heads/{branch}",
+                access_token=access_token, priority=PRIORITY_HIGH,
+                headers=headers,
+                json={"sha": commit["sha"], "force": False},
+                timeout=30.0
+            )
+            if update_res.status_code == 200:
+                break
+            if update_res.status_code == 422 and attempt == 0:
+                print(f"[github_push.py] Branch {branch} moved during batch push, rebuilding commit")
+                continue
+            raise _github_error(update_res, "update branch ref")
+
+        record_commit(access_token, repo, commit["sha"], blobs)
+        print(f"[github_push.py] Batch push committed {commit['sha']} with {len(blobs)} files")
+        return 201, {
+            "commit": {"sha": commit["sha"], "html_url": commit.get("html_url")},
+            "branch": branch,
+            "files": [{"path": path, "sha": sha} for path, sha in blobs.items()]
+        }
+
+    except HTTPException as e:
+        if e.status_code == 401:
+            await invalidate_github_auth(access_token)
+        raise
+    except httpx.TimeoutException:
+        print(f"[github_push.py] Timeout error when contacting GitHub API")
+        raise HTTPException(status_code=504, detail="GitHub API request timed out")
+    except httpx.RequestError as e:
+        print(f"[github_push.py] GitHub API request error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"GitHub API request error: {str(e)}")
+    except Exception as e:
+        print(f"[github_push.py] Unexpected error in batch push: {str(e)}")
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Failed to push files: {str(e)}")
+
 async def check_and_push_code(access_token: str, repo: str, filename: str, content: str):
     existing_content, sha = await get_existing_file_content(access_token, repo, filename)
     
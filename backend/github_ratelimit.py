@@ -0,0 +1,176 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+from fastapi import HTTPException
+
+# Per-token GitHub quota tracking and request scheduling. Every upstream call
+# goes through acquire()/release(): calls wait out Retry-After / secondary
+# rate-limit backoff, low-priority calls (repo probing) are skipped with
+# LowPrioritySkipped while the remaining quota is in the reserve, and a
+# per-token concurrency gate hands free slots to the highest-priority waiter
+# first.
+
+PRIORITY_HIGH = 0     # content writes the user is waiting on
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2      # probing / verification that can be skipped or delayed
+
+GITHUB_MAX_CONCURRENCY_PER_TOKEN = int(os.getenv("GITHUB_MAX_CONCURRENCY_PER_TOKEN", "4"))
+GITHUB_RATELIMIT_RESERVE = int(os.getenv("GITHUB_RATELIMIT_RESERVE", "50"))
+GITHUB_RATELIMIT_MAX_WAIT = float(os.getenv("GITHUB_RATELIMIT_MAX_WAIT", "20"))
+GITHUB_SECONDARY_BACKOFF = float(os.getenv("GITHUB_SECONDARY_BACKOFF", "60"))
+
+
+class LowPrioritySkipped(HTTPException):
+    """A PRIORITY_LOW call was not sent because the quota left is kept for writes.
+
+    Callers should carry on without the answer rather than fail the request.
+    """
+
+    def __init__(self, reset_in: float):
+        super().__init__(
+            status_code=429,
+            detail=f"GitHub quota reserved for writes, retry in {int(reset_in) + 1}s",
+            headers={"Retry-After": str(int(reset_in) + 1)}
+        )
+
+
+class _TokenState:
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self.blocked_until = 0.0
+        self.in_flight = 0
+        self.waiters = []
+        self.requests = 0
+        self.throttled = 0
+        self.rate_limited = 0
+        self.skipped = 0
+
+    def in_reserve(self, now: float) -> bool:
+        return (self.remaining is not None and self.reset_at is not None
+                and self.reset_at > now and self.remaining <= GITHUB_RATELIMIT_RESERVE)
+
+    def delay_for(self, now: float) -> float:
+        delay = self.blocked_until - now
+        if self.remaining == 0 and self.reset_at:
+            delay = max(delay, self.reset_at - now)
+        return delay
+
+
+class RateLimitScheduler:
+    def __init__(self):
+        self._states = {}
+        self._seq = itertools.count()
+
+    def _state(self, key: str) -> _TokenState:
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _TokenState()
+        return state
+
+    async def acquire(self, key: str, priority: int = PRIORITY_NORMAL):
+        state = self._state(key)
+        now = time.time()
+
+        if priority >= PRIORITY_LOW and state.in_reserve(now):
+            # keep the last part of the quota for writes
+            state.skipped += 1
+            raise LowPrioritySkipped(state.reset_at - now)
+
+        delay = state.delay_for(now)
+        if delay > 0:
+            if delay > GITHUB_RATELIMIT_MAX_WAIT:
+                raise HTTPException(
+                    status_code=429,
+                    detail=f"GitHub rate limit reached, retry in {int(delay) + 1}s",
+                    headers={"Retry-After": str(int(delay) + 1)}
+                )
+            state.throttled += 1
+            await asyncio.sleep(delay)
+
+        if state.in_flight < GITHUB_MAX_CONCURRENCY_PER_TOKEN and not state.waiters:
+            state.in_flight += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(state.waiters, (priority, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # slot was handed to us just before we were cancelled
+                self.release(key)
+            else:
+                future.cancel()
+            raise
+
+    def release(self, key: str):
+        state = self._state(key)
+        while state.waiters:
+            _, _, future = heapq.heappop(state.waiters)
+            if not future.done():
+                # hand the slot straight to the next waiter
+                future.set_result(None)
+                return
+        state.in_flight -= 1
+
+    def update(self, key: str, response) -> float:
+        """Record quota headers from a response; returns the backoff GitHub asked for, if any"""
+        state = self._state(key)
+        state.requests += 1
+        headers = response.headers
+        now = time.time()
+
+        if headers.get("x-ratelimit-limit"):
+            state.limit = int(headers["x-ratelimit-limit"])
+        if headers.get("x-ratelimit-remaining"):
+            state.remaining = int(headers["x-ratelimit-remaining"])
+        if headers.get("x-ratelimit-reset"):
+            state.reset_at = float(headers["x-ratelimit-reset"])
+
+        if response.status_code not in (403, 429):
+            return 0.0
+
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            backoff = float(retry_after)
+        elif state.remaining == 0 and state.reset_at:
+            backoff = max(state.reset_at - now, 1.0)
+        elif response.status_code == 429 or "rate limit" in response.text.lower():
+            backoff = GITHUB_SECONDARY_BACKOFF
+        else:
+            # plain permission 403
+            return 0.0
+
+        state.rate_limited += 1
+        state.blocked_until = max(state.blocked_until, now + backoff)
+        print(f"[github_ratelimit.py] Rate limited ({response.status_code}), backing off {backoff:.0f}s")
+        return backoff
+
+    def snapshot(self):
+        now = time.time()
+        return {
+            key[:12]: {
+                "limit": state.limit,
+                "remaining": state.remaining,
+                "reset_in": round(state.reset_at - now, 1) if state.reset_at else None,
+                "blocked_for": round(max(state.blocked_until - now, 0.0), 1),
+                "in_flight": state.in_flight,
+                "queued": sum(1 for _, _, f in state.waiters if not f.done()),
+                "requests": state.requests,
+                "throttled": state.throttled,
+                "rate_limited": state.rate_limited,
+                "skipped": state.skipped,
+            }
+            for key, state in self._states.items()
+        }
+
+
+scheduler = RateLimitScheduler()
+
+
+def get_rate_limit_stats():
+    return scheduler.snapshot()
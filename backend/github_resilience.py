@@ -0,0 +1,129 @@
+import os
+import time
+import random
+import httpx
+from fastapi import HTTPException
+
+# Retry policy and circuit breaker shared by every upstream GitHub call.
+# Transient failures (transport errors, 500/502/503/504) are retried with
+# full-jitter backoff when the request is safe to repeat; after enough
+# consecutive failures the breaker opens and calls fail fast with a 503
+# until a half-open probe succeeds.
+
+GITHUB_RETRY_ATTEMPTS = int(os.getenv("GITHUB_RETRY_ATTEMPTS", "3"))
+GITHUB_RETRY_BASE_DELAY = float(os.getenv("GITHUB_RETRY_BASE_DELAY", "0.5"))
+GITHUB_RETRY_MAX_DELAY = float(os.getenv("GITHUB_RETRY_MAX_DELAY", "4"))
+GITHUB_BREAKER_THRESHOLD = int(os.getenv("GITHUB_BREAKER_THRESHOLD", "5"))
+GITHUB_BREAKER_COOLDOWN = float(os.getenv("GITHUB_BREAKER_COOLDOWN", "30"))
+
+RETRYABLE_STATUS = {500, 502, 503, 504}
+
+# Raised before the request left this process, so repeating it is always safe
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class GitHubUnavailable(HTTPException):
+    """GitHub is considered unhealthy and the circuit breaker is open"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            status_code=503,
+            detail="GitHub is currently unavailable, please retry shortly",
+            headers={"Retry-After": str(int(retry_after) + 1)}
+        )
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+
+    def before_call(self) -> bool:
+        """Raise GitHubUnavailable when open; returns True if this call is the half-open probe"""
+        if self.state == "closed":
+            return False
+        remaining = self.opened_at + self.cooldown - time.monotonic()
+        if self.state == "open" and remaining <= 0:
+            self.state = "half_open"
+        if self.state == "half_open" and not self.probe_in_flight:
+            # let exactly one request through to test the water
+            self.probe_in_flight = True
+            return True
+        self.rejected += 1
+        raise GitHubUnavailable(max(remaining, 1.0))
+
+    def abort_probe(self):
+        """The probe ended without an answer from GitHub (e.g. cancelled)"""
+        self.probe_in_flight = False
+
+    def record_success(self):
+        if self.state != "closed":
+            print("[github_resilience.py] GitHub healthy again, closing circuit breaker")
+        self.state = "closed"
+        self.failures = 0
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.probe_in_flight = False
+        if self.state == "half_open" or (self.state == "closed" and self.failures >= self.threshold):
+            print(f"[github_resilience.py] Opening circuit breaker after {self.failures} consecutive failures")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+
+    def snapshot(self):
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected,
+            "open_for": round(max(self.opened_at + self.cooldown - time.monotonic(), 0.0), 1) if self.state == "open" else 0.0,
+        }
+
+
+breaker = CircuitBreaker(GITHUB_BREAKER_THRESHOLD, GITHUB_BREAKER_COOLDOWN)
+
+_retry_stats = {
+    "retries": 0,
+    "retried_transport_errors": 0,
+    "retried_status": 0,
+    "exhausted": 0,
+}
+
+
+def retry_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry number (1-based)"""
+    return random.uniform(0, min(GITHUB_RETRY_MAX_DELAY, GITHUB_RETRY_BASE_DELAY * (2 ** (attempt - 1))))
+
+
+def should_retry_error(error: Exception, attempt: int, retry_safe: bool) -> bool:
+    if attempt >= GITHUB_RETRY_ATTEMPTS:
+        _retry_stats["exhausted"] += 1
+        return False
+    if retry_safe or isinstance(error, NOT_SENT_ERRORS):
+        _retry_stats["retries"] += 1
+        _retry_stats["retried_transport_errors"] += 1
+        return True
+    return False
+
+
+def should_retry_status(status_code: int, attempt: int, retry_safe: bool) -> bool:
+    if status_code not in RETRYABLE_STATUS or not retry_safe:
+        return False
+    if attempt >= GITHUB_RETRY_ATTEMPTS:
+        _retry_stats["exhausted"] += 1
+        return False
+    _retry_stats["retries"] += 1
+    _retry_stats["retried_status"] += 1
+    return True
+
+
+def get_resilience_stats():
+    return {"breaker": breaker.snapshot(), "retries": dict(_retry_stats)}
@@ -0,0 +1,87 @@
+import base64
+from fastapi import HTTPException
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from models import LeaderboardEntry, User
+
+# The leaderboard table holds per-user ranking totals so /ranking is a single
+# indexed read instead of a scan over every user's push logs. Rows are updated
+# inside the transaction that records the push; scripts/rebuild_leaderboard.py
+# recomputes the whole table from push_logs.
+
+
+def tally(logs) -> dict:
+    """Fold (language, point) pairs into {"total_solved", "total_point", "by_language"}"""
+    totals = {"total_solved": 0, "total_point": 0, "by_language": {}}
+    for language, point in logs:
+        totals["total_solved"] += 1
+        totals["total_point"] += point or 0
+        totals["by_language"][language] = totals["by_language"].get(language, 0) + 1
+    return totals
+
+
+async def apply_to_leaderboard(db, user_id: int, logs):
+    """Add pushed (language, point) pairs to a user's row; the caller commits"""
+    logs = list(logs)
+    if not logs:
+        return
+    delta = tally(logs)
+
+    await db.execute(
+        pg_insert(LeaderboardEntry)
+        .values(user_id=user_id, total_solved=0, total_point=0, by_language={})
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+    # Row lock so concurrent pushes for the same user don't lose each other's counts
+    result = await db.execute(
+        select(LeaderboardEntry).where(LeaderboardEntry.user_id == user_id).with_for_update()
+    )
+    entry = result.scalar_one()
+
+    by_language = dict(entry.by_language or {})
+    for language, count in delta["by_language"].items():
+        by_language[language] = by_language.get(language, 0) + count
+    entry.total_solved = (entry.total_solved or 0) + delta["total_solved"]
+    entry.total_point = (entry.total_point or 0) + delta["total_point"]
+    entry.by_language = by_language
+
+
+async def add_leaderboard_points(db, user_id: int, points: int):
+    """Add points to a user's existing row (push logs linked to their problem later); the caller commits"""
+    if not points:
+        return
+    await db.execute(
+        update(LeaderboardEntry)
+        .where(LeaderboardEntry.user_id == user_id)
+        .values(total_point=LeaderboardEntry.total_point + points)
+    )
+
+
+def encode_cursor(total_point: int, user_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{total_point}:{user_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        total_point, user_id = raw.split(":")
+        return int(total_point), int(user_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def ranking_query(limit: int, cursor: str = None):
+    """One /ranking page (plus one row to detect a next page) in (total_point desc, user_id) order"""
+    query = (
+        select(LeaderboardEntry, User.username)
+        .join(User, User.id == LeaderboardEntry.user_id)
+        .order_by(LeaderboardEntry.total_point.desc(), LeaderboardEntry.user_id)
+        .limit(limit + 1)
+    )
+    if cursor:
+        after_point, after_user_id = decode_cursor(cursor)
+        query = query.where(or_(
+            LeaderboardEntry.total_point < after_point,
+            and_(LeaderboardEntry.total_point == after_point, LeaderboardEntry.user_id > after_user_id)
+        ))
+    return query
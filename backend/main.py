@@ -1,4 +1,10 @@
 from init_db import init_db
+from github_client import init_github_client, close_github_client
+from push_outbox import start_push_workers, stop_push_workers
+from push_log import start_push_log_buffer, stop_push_log_buffer
+from problem_catalog import load_problem_catalog, start_problem_catalog_watcher, stop_problem_catalog_watcher
+from utils.leetcode import close_leetcode_client
+from utils.cache_backend import close_cache_backends
 from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import FastAPI
@@ -31,18 +37,38 @@ app.add_middleware(
 )
 
 # Import routers after FastAPI app is created
-from routers import user, stats, auth, push, solution
+from routers import user, stats, auth, push, solution, admin
 
 app.include_router(user.user_router)
 app.include_router(stats.stats_router)
 app.include_router(auth.auth_router)
 app.include_router(push.push_router)
 app.include_router(solution.solution_router)
+app.include_router(admin.admin_router)
 # app.include_router(user.user_detail_router)
 
 @app.on_event("startup")
 async def startup_event():
     print("🟡 [startup] Running startup event...")
+    await init_github_client()
+    try:
+        await load_problem_catalog()
+    except Exception as e:
+        # Pushes still work, they just record no points until the next reload
+        print(f"🔴 [startup] Could not load problem catalog: {e}")
+    await start_problem_catalog_watcher()
+    await start_push_workers()
+    await start_push_log_buffer()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    print("🟡 [shutdown] Running shutdown event...")
+    await stop_push_workers()
+    await stop_push_log_buffer()
+    await stop_problem_catalog_watcher()
+    await close_github_client()
+    await close_leetcode_client()
+    await close_cache_backends()
 
 @app.get("/")
 async def root():
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, func 
+from sqlalchemy import Column, Integer, String, DateTime, Date, Text, ForeignKey, JSON, Index, func 
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -11,9 +11,18 @@ class PushLog(Base):
     filename = Column(String)
     language = Column(String)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    problem_slug = Column(String, index=True, nullable=True)  # e.g. "two-sum", parsed from filename at push time
+    problem_id = Column(Integer, ForeignKey("problems.id"), nullable=True)
+    point = Column(Integer, nullable=True)  # problem points when pushed, NULL if the problem is unknown
 
     user = relationship("User", back_populates="push_logs")
 
+    __table_args__ = (
+        Index("ix_push_logs_user_id_timestamp", user_id, timestamp.desc()),
+        # push logs still waiting for their problem (scripts/load_problems.py links them)
+        Index("ix_push_logs_unlinked_slug", problem_slug, postgresql_where=problem_id.is_(None)),
+    )
+
 
 class User(Base):
     __tablename__ = "users"
@@ -43,6 +52,10 @@ class Solution(Base):
 
     user = relationship("User", back_populates="solutions")
 
+    __table_args__ = (
+        Index("ix_solutions_user_id_problem_slug", user_id, problem_slug),
+    )
+
 
 class Problem(Base):
     __tablename__ = "problems"
@@ -50,4 +63,68 @@ class Problem(Base):
     id = Column(Integer, primary_key=True, index=True)
     slug = Column(String, unique=True)
     difficulty = Column(String)
-    point = Column(Integer)
\ No newline at end of file
+    point = Column(Integer)
+    frontend_id = Column(String, nullable=True)  # number shown on leetcode.com, e.g. "1"
+
+
+class PushJob(Base):
+    """Outbox row for a push that is executed asynchronously by the push workers"""
+    __tablename__ = "push_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    push_log_id = Column(Integer, ForeignKey("push_logs.id"), nullable=True)
+    repo = Column(String)
+    filename = Column(String)
+    content = Column(Text)
+    status = Column(String, default="pending", index=True)  # pending / running / done / failed
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text, nullable=True)
+    commit_sha = Column(String, nullable=True)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now())
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Only unfinished jobs are ever claimed or block a later job
+    __table_args__ = (
+        Index("ix_push_jobs_open", id, postgresql_where=status.in_(("pending", "running"))),
+        Index("ix_push_jobs_open_user_repo", user_id, repo, id, postgresql_where=status.in_(("pending", "running"))),
+    )
+
+
+class LeaderboardEntry(Base):
+    """Per-user ranking totals, maintained in the same transaction as each push"""
+    __tablename__ = "leaderboard"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_solved = Column(Integer, nullable=False, default=0)
+    total_point = Column(Integer, nullable=False, default=0)
+    by_language = Column(JSON, nullable=False, default=dict)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # /ranking reads in (total_point desc, user_id) order with a keyset cursor
+    __table_args__ = (
+        Index("ix_leaderboard_total_point_user_id", total_point.desc(), user_id),
+    )
+
+
+class UserStats(Base):
+    """Per-user counters for /stats and /user/{username}, maintained on push"""
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_solved = Column(Integer, nullable=False, default=0)
+    by_language = Column(JSON, nullable=False, default=dict)
+    recent = Column(JSON, nullable=False, default=list)  # last 5 pushes, newest first
+    longest_streak = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class ActivityDay(Base):
+    """Push count per user and UTC day, only for days with activity"""
+    __tablename__ = "activity_days"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
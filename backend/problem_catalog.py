@@ -0,0 +1,130 @@
+import os
+import asyncio
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+from sqlalchemy import select
+from database import SessionLocal
+from models import Problem
+from utils.cache_backend import get_cache
+
+# Read-only in-memory copy of the problems table: slug -> ProblemInfo.
+# Loaded at startup and swapped atomically on reload, so scoring a push
+# never costs a database round trip per problem. The table itself is filled
+# by scripts/load_problems.py.
+#
+# An admin reload (publish_problem_catalog_reload) bumps a catalog version in
+# the shared cache backend; every worker polls it every
+# PROBLEM_CATALOG_POLL_SECONDS and reloads when it changed. With the memory
+# backend the version is per process, so only the worker that served the
+# reload picks it up - run CACHE_BACKEND=redis with more than one worker.
+
+PROBLEM_CATALOG_POLL_SECONDS = float(os.getenv("PROBLEM_CATALOG_POLL_SECONDS", "5"))
+
+
+# Used when a problem's point value is not known explicitly
+DIFFICULTY_POINTS = {"Easy": 1, "Medium": 2, "Hard": 3}
+
+
+class ProblemInfo(NamedTuple):
+    id: int
+    slug: str
+    difficulty: Optional[str]
+    point: Optional[int]
+    frontend_id: Optional[str]
+
+
+_catalog = MappingProxyType({})
+_loaded_at = None
+_reloads = 0
+_reload_lock = asyncio.Lock()
+_stats = {"lookups": 0, "misses": 0}
+_versions = get_cache("problem_catalog", maxsize=16, ttl=0)
+_version = 0
+_watcher = None
+
+
+async def load_problem_catalog() -> int:
+    """(Re)load the catalog from the problems table; returns the number of problems"""
+    global _catalog, _loaded_at, _reloads, _version
+    async with _reload_lock:
+        # read before loading, so a reload published meanwhile is picked up on the next poll
+        version = await _versions.get("version", 0)
+        async with SessionLocal() as db:
+            result = await db.execute(
+                select(Problem.id, Problem.slug, Problem.difficulty, Problem.point, Problem.frontend_id)
+            )
+            catalog = {row.slug: ProblemInfo(*row) for row in result.all() if row.slug}
+
+        # Single reference swap: readers see either the old or the new map, never a mix
+        _catalog = MappingProxyType(catalog)
+        _loaded_at = datetime.now(timezone.utc)
+        _reloads += 1
+        _version = version
+    print(f"[problem_catalog.py] Loaded {len(catalog)} problems")
+    return len(catalog)
+
+
+async def publish_problem_catalog_reload() -> int:
+    """Reload here and tell the other workers to reload too; returns the number of problems"""
+    await _versions.incr("version")
+    return await load_problem_catalog()
+
+
+async def _watch_loop():
+    while True:
+        await asyncio.sleep(PROBLEM_CATALOG_POLL_SECONDS)
+        try:
+            # also retries a catalog that failed to load at startup
+            if _loaded_at is None or await _versions.get("version", 0) != _version:
+                await load_problem_catalog()
+        except Exception as e:
+            print(f"[problem_catalog.py] Catalog reload failed: {str(e)}")
+
+
+async def start_problem_catalog_watcher():
+    global _watcher
+    if _watcher is None:
+        _watcher = asyncio.create_task(_watch_loop())
+
+
+async def stop_problem_catalog_watcher():
+    global _watcher
+    if _watcher is None:
+        return
+    _watcher.cancel()
+    try:
+        await _watcher
+    except asyncio.CancelledError:
+        pass
+    _watcher = None
+
+
+def extend_problem_catalog(problems):
+    """Add/replace entries without a full reload (copy-on-write, same atomic swap)"""
+    global _catalog
+    problems = list(problems)
+    if problems:
+        _catalog = MappingProxyType({**_catalog, **{p.slug: p for p in problems}})
+
+
+def get_problem(slug: str) -> Optional[ProblemInfo]:
+    _stats["lookups"] += 1
+    problem = _catalog.get(slug)
+    if problem is None:
+        _stats["misses"] += 1
+    return problem
+
+
+def get_problem_catalog():
+    return _catalog
+
+
+def get_problem_catalog_stats():
+    return {
+        **_stats,
+        "size": len(_catalog),
+        "reloads": _reloads,
+        "version": _version,
+        "loaded_at": _loaded_at.isoformat() if _loaded_at else None
+    }
@@ -0,0 +1,94 @@
+import os
+import asyncio
+from github_push import push_code_to_github, push_files_to_github
+
+# Coalesces bursts of pushes to the same (user, repo) - e.g. several problems
+# solved back to back or Ctrl+M pressed repeatedly - into a single commit.
+# A push to an idle repo goes out immediately, so a lone push never waits.
+# Writes that arrive while a push to that repo is still running are collected
+# (later content for a path wins) and sent as one commit as soon as it
+# finishes; every caller in that batch receives the same result / commit SHA.
+# PUSH_COALESCE_WINDOW_MS optionally holds a collected batch a little longer
+# to let more writes join it.
+
+PUSH_COALESCE_WINDOW_MS = float(os.getenv("PUSH_COALESCE_WINDOW_MS", "0"))
+
+_pending = {}
+_busy = set()
+
+_stats = {
+    "requests": 0,
+    "commits": 0,
+    "merged_writes": 0,
+}
+
+
+class _Batch:
+    def __init__(self, access_token: str, repo: str):
+        self.access_token = access_token
+        self.repo = repo
+        self.files = {}
+        self.writes = 0
+        self.future = asyncio.get_running_loop().create_future()
+        self.task = None
+
+
+def _release(key):
+    """A push to key finished: send what queued up meanwhile, or mark the repo idle"""
+    batch = _pending.get(key)
+    if batch is None:
+        _busy.discard(key)
+        return
+    batch.task = asyncio.create_task(_flush(key, batch))
+
+
+async def _flush(key, batch: _Batch):
+    try:
+        if PUSH_COALESCE_WINDOW_MS > 0:
+            # still in _pending, so writes arriving now join this batch
+            await asyncio.sleep(PUSH_COALESCE_WINDOW_MS / 1000)
+        # From here on new writes start the next batch
+        if _pending.get(key) is batch:
+            del _pending[key]
+        _stats["commits"] += 1
+        _stats["merged_writes"] += batch.writes - 1
+        if len(batch.files) == 1:
+            (filename, content), = batch.files.items()
+            result = await push_code_to_github(batch.access_token, batch.repo, filename, content)
+        else:
+            print(f"[push_coalescer.py] Coalescing {batch.writes} writes ({len(batch.files)} files) to {batch.repo}")
+            result = await push_files_to_github(batch.access_token, batch.repo, batch.files)
+        batch.future.set_result(result)
+    except Exception as e:
+        batch.future.set_exception(e)
+    finally:
+        if _pending.get(key) is batch:
+            del _pending[key]
+        _release(key)
+
+
+async def coalesced_push(user_id: int, access_token: str, repo: str, filename: str, content: str):
+    """Same contract as push_code_to_github: returns (status, result)"""
+    _stats["requests"] += 1
+    key = (user_id, repo.lower())
+
+    if key not in _busy:
+        _busy.add(key)
+        _stats["commits"] += 1
+        try:
+            return await push_code_to_github(access_token, repo, filename, content)
+        finally:
+            _release(key)
+
+    batch = _pending.get(key)
+    if batch is None:
+        batch = _pending[key] = _Batch(access_token, repo)
+    batch.files[filename] = content
+    batch.access_token = access_token
+    batch.writes += 1
+    # Shield so one caller disconnecting doesn't cancel the commit for everyone else
+    return await asyncio.shield(batch.future)
+
+
+def get_push_coalescer_stats():
+    return {**_stats, "window_ms": PUSH_COALESCE_WINDOW_MS, "busy_repos": len(_busy), "open_batches": len(_pending)}
@@ -0,0 +1,336 @@
+import os
+import time
+import asyncio
+import traceback
+from datetime import datetime, timezone
+from sqlalchemy import insert, update, func
+from sqlalchemy.exc import IntegrityError, DataError
+from database import SessionLocal
+from models import User, PushLog, Problem
+from leaderboard import apply_to_leaderboard, add_leaderboard_points
+from user_stats import apply_to_user_stats
+from activity import apply_to_activity
+from problem_catalog import get_problem
+from utils.leetcode import problem_slug_from_filename, get_problems
+from response_cache import bump_generation
+
+# Recording of successful pushes (PushLog rows, users.last_push and the
+# user's leaderboard / stats rows).
+#
+# PUSH_LOG_MODE=sync (default) writes everything for a push in one
+# transaction before the request returns. PUSH_LOG_MODE=buffered is a
+# write-behind buffer: rows are collected in memory and flushed as one
+# multi-row insert plus one last_push update per user, when the buffer
+# reaches PUSH_LOG_FLUSH_SIZE rows, every PUSH_LOG_FLUSH_INTERVAL_MS and on
+# shutdown. Buffered mode trades durability for fewer transactions - rows
+# not yet flushed are lost if the process is killed. When a batch fails it is
+# retried one user at a time, so a bad row (e.g. its user was deleted) only
+# holds back that user; rows rejected by the database PUSH_LOG_MAX_ATTEMPTS
+# times are dead-lettered (logged and kept for /admin/push-log/dead-letters).
+#
+# Problems are attached from the in-memory catalog only, so recording a push
+# never waits on LeetCode. Rows for slugs the catalog doesn't have are written
+# with problem_id NULL and linked by a background task once the slug has been
+# resolved (problems table / LeetCode), which also adds their points to the
+# leaderboard.
+
+PUSH_LOG_MODE = os.getenv("PUSH_LOG_MODE", "sync").lower()
+PUSH_LOG_FLUSH_SIZE = int(os.getenv("PUSH_LOG_FLUSH_SIZE", "200"))
+PUSH_LOG_FLUSH_INTERVAL_MS = float(os.getenv("PUSH_LOG_FLUSH_INTERVAL_MS", "1000"))
+# Upper bound on rows kept in memory while the database is unreachable
+PUSH_LOG_MAX_BUFFER = int(os.getenv("PUSH_LOG_MAX_BUFFER", "10000"))
+PUSH_LOG_MAX_ATTEMPTS = int(os.getenv("PUSH_LOG_MAX_ATTEMPTS", "3"))
+PUSH_LOG_DEAD_LETTER_SIZE = int(os.getenv("PUSH_LOG_DEAD_LETTER_SIZE", "1000"))
+
+# Errors that retrying the same rows won't fix (as opposed to the database being unreachable)
+PERMANENT_ERRORS = (IntegrityError, DataError)
+
+_rows = []
+_last_push = {}
+_wakeup = asyncio.Event()
+_flush_lock = asyncio.Lock()
+_flusher = None
+_stopping = False
+_attempts = {}
+_dead_letters = []
+_link_tasks = set()
+
+_stats = {
+    "recorded": 0,
+    "flushes": 0,
+    "rows_flushed": 0,
+    "failed_flushes": 0,
+    "dropped_rows": 0,
+    "isolated_writes": 0,
+    "dead_lettered": 0,
+    "linked_later": 0,
+    "link_failures": 0,
+    "last_flush_size": 0,
+    "max_flush_size": 0,
+    "last_flush_ms": 0.0,
+    "max_flush_ms": 0.0,
+    "total_flush_ms": 0.0,
+}
+
+
+def _buffered() -> bool:
+    return PUSH_LOG_MODE == "buffered" and _flusher is not None
+
+
+def push_log_row(user_id: int, filename: str, pushed_at: datetime) -> dict:
+    return {
+        "user_id": user_id,
+        "filename": filename,
+        "language": filename.split('.')[-1],
+        "timestamp": pushed_at,
+        "problem_slug": problem_slug_from_filename(filename),
+        "problem_id": None,
+        "point": None,
+    }
+
+
+def attach_problems(rows: list) -> set:
+    """Fill problem_id / point on push log rows from the catalog; returns the slugs it couldn't.
+
+    Hand those to link_problems_later() once the rows are committed.
+    """
+    unlinked = set()
+    for row in rows:
+        if row["problem_id"] is not None or not row["problem_slug"]:
+            continue
+        problem = get_problem(row["problem_slug"])
+        if problem is not None:
+            row["problem_id"], row["point"] = problem.id, problem.point
+        else:
+            unlinked.add(row["problem_slug"])
+    return unlinked
+
+
+async def _link_problems(slugs: set):
+    try:
+        problems = await get_problems(slugs)
+        if not problems:
+            return
+        async with SessionLocal() as db:
+            result = await db.execute(
+                update(PushLog)
+                .where(
+                    PushLog.problem_id.is_(None),
+                    PushLog.problem_slug == Problem.slug,
+                    Problem.slug.in_(list(problems))
+                )
+                .values(problem_id=Problem.id, point=Problem.point)
+                .returning(PushLog.user_id, PushLog.point)
+                .execution_options(synchronize_session=False)
+            )
+            points = {}
+            linked = 0
+            for user_id, point in result.all():
+                points[user_id] = points.get(user_id, 0) + (point or 0)
+                linked += 1
+            for user_id in sorted(points):
+                await add_leaderboard_points(db, user_id, points[user_id])
+            await db.commit()
+        _stats["linked_later"] += linked
+        if points:
+            await bump_generation(set(points))
+    except Exception as e:
+        _stats["link_failures"] += 1
+        print(f"[push_log.py] Linking push logs for {sorted(slugs)} failed: {str(e)}")
+
+
+def link_problems_later(slugs: set):
+    """Resolve slugs off the request path and link the push logs recorded without them"""
+    if not slugs:
+        return
+    task = asyncio.create_task(_link_problems(slugs))
+    _link_tasks.add(task)
+    task.add_done_callback(_link_tasks.discard)
+
+
+async def apply_push_aggregates(db, user_id: int, rows: list):
+    """Update the per-user aggregates for new push log rows inside the caller's transaction"""
+    await apply_to_leaderboard(db, user_id, [(r["language"], r["point"]) for r in rows])
+    await apply_to_user_stats(db, user_id, [(r["filename"], r["language"], r["timestamp"]) for r in rows])
+    await apply_to_activity(db, user_id, [r["timestamp"] for r in rows])
+
+
+async def _write(rows: list, last_push: dict):
+    by_user = {}
+    for row in rows:
+        by_user.setdefault(row["user_id"], []).append(row)
+
+    unlinked = attach_problems(rows)
+    async with SessionLocal() as db:
+        if rows:
+            await db.execute(insert(PushLog), rows)
+        # Lock order is aggregates (leaderboard, user_stats) then users, each in
+        # user id order; routers/push.py:_queue_push must follow the same order
+        for user_id in sorted(by_user):
+            await apply_push_aggregates(db, user_id, by_user[user_id])
+        for user_id, pushed_at in sorted(last_push.items()):
+            await db.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(last_push=func.greatest(User.last_push, pushed_at))
+            )
+        await db.commit()
+    await bump_generation(set(by_user) | set(last_push))
+    link_problems_later(unlinked)
+
+
+def _dead_letter(user_id: int, rows: list, error: Exception):
+    _stats["dead_lettered"] += len(rows)
+    print(f"[push_log.py] Dead-lettering {len(rows)} push logs of user {user_id}: {str(error)}")
+    for row in rows:
+        print(f"[push_log.py] Dead letter: {row}")
+        _dead_letters.append({"row": row, "error": str(error)})
+    del _dead_letters[:-PUSH_LOG_DEAD_LETTER_SIZE]
+
+
+async def _write_each_user(rows: list, last_push: dict):
+    """Retry a failed batch one user per transaction; returns the rows / last_push still to write"""
+    by_user = {}
+    for row in rows:
+        by_user.setdefault(row["user_id"], []).append(row)
+
+    pending_rows, pending_last_push = [], {}
+    user_ids = sorted(set(by_user) | set(last_push))
+    for i, user_id in enumerate(user_ids):
+        user_rows = by_user.get(user_id, [])
+        user_last_push = {user_id: last_push[user_id]} if user_id in last_push else {}
+        try:
+            await _write(user_rows, user_last_push)
+            _stats["isolated_writes"] += 1
+            _attempts.pop(user_id, None)
+            continue
+        except PERMANENT_ERRORS as e:
+            attempts = _attempts[user_id] = _attempts.get(user_id, 0) + 1
+            if attempts >= PUSH_LOG_MAX_ATTEMPTS:
+                _attempts.pop(user_id, None)
+                _dead_letter(user_id, user_rows, e)
+                continue
+        except Exception:
+            # database unreachable or similar - keep this user and everyone after it for the next flush
+            for rest in user_ids[i:]:
+                pending_rows.extend(by_user.get(rest, []))
+                if rest in last_push:
+                    pending_last_push[rest] = last_push[rest]
+            break
+        pending_rows.extend(user_rows)
+        pending_last_push.update(user_last_push)
+    return pending_rows, pending_last_push
+
+
+async def record_push(user_id: int, filenames: list):
+    """Record a successful push of one or more files for a user"""
+    pushed_at = datetime.now(timezone.utc)
+    rows = [push_log_row(user_id, filename, pushed_at) for filename in filenames]
+    _stats["recorded"] += len(rows)
+
+    if not _buffered():
+        await _write(rows, {user_id: pushed_at})
+        return
+
+    _rows.extend(rows)
+    _last_push[user_id] = pushed_at
+    if len(_rows) >= PUSH_LOG_FLUSH_SIZE:
+        _wakeup.set()
+
+
+async def flush_push_logs():
+    """Write out everything currently buffered; returns the number of rows written"""
+    global _rows, _last_push
+    async with _flush_lock:
+        if not _rows and not _last_push:
+            return 0
+        rows, last_push = _rows, _last_push
+        _rows, _last_push = [], {}
+
+        started = time.perf_counter()
+        try:
+            await _write(rows, last_push)
+        except Exception:
+            _stats["failed_flushes"] += 1
+            print(f"[push_log.py] Flush of {len(rows)} push logs failed, retrying them user by user")
+            print(traceback.format_exc())
+            failed_rows, last_push = await _write_each_user(rows, last_push)
+            if not failed_rows and not last_push:
+                return len(rows)
+            print(f"[push_log.py] Keeping {len(failed_rows)} push logs for the next attempt")
+            # Put them back in front of anything recorded meanwhile
+            _rows = failed_rows + _rows
+            for user_id, pushed_at in last_push.items():
+                _last_push[user_id] = max(pushed_at, _last_push.get(user_id, pushed_at))
+            overflow = len(_rows) - PUSH_LOG_MAX_BUFFER
+            if overflow > 0:
+                _stats["dropped_rows"] += overflow
+                print(f"[push_log.py] Buffer full, dropping {overflow} oldest push logs")
+                del _rows[:overflow]
+            return 0
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        _stats["flushes"] += 1
+        _stats["rows_flushed"] += len(rows)
+        _stats["last_flush_size"] = len(rows)
+        _stats["max_flush_size"] = max(_stats["max_flush_size"], len(rows))
+        _stats["last_flush_ms"] = round(elapsed_ms, 2)
+        _stats["max_flush_ms"] = round(max(_stats["max_flush_ms"], elapsed_ms), 2)
+        _stats["total_flush_ms"] += elapsed_ms
+        return len(rows)
+
+
+async def _flush_loop():
+    while not _stopping:
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=PUSH_LOG_FLUSH_INTERVAL_MS / 1000)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+        await flush_push_logs()
+
+
+async def start_push_log_buffer():
+    global _flusher, _stopping
+    if PUSH_LOG_MODE != "buffered":
+        return
+    _stopping = False
+    _flusher = asyncio.create_task(_flush_loop())
+    print(f"[push_log.py] Write-behind push log buffer enabled (size {PUSH_LOG_FLUSH_SIZE}, interval {PUSH_LOG_FLUSH_INTERVAL_MS:.0f}ms)")
+
+
+async def stop_push_log_buffer():
+    global _flusher, _stopping
+    if _flusher is None:
+        return
+    _stopping = True
+    _wakeup.set()
+    try:
+        await asyncio.wait_for(_flusher, timeout=10.0)
+    except asyncio.TimeoutError:
+        _flusher.cancel()
+    _flusher = None
+    # Whatever arrived after the loop's last pass
+    written = await flush_push_logs()
+    if _rows:
+        print(f"[push_log.py] {len(_rows)} push logs could not be written on shutdown")
+    elif written:
+        print(f"[push_log.py] Flushed {written} push logs on shutdown")
+
+
+def get_dead_letter_push_logs():
+    return list(_dead_letters)
+
+
+def get_push_log_stats():
+    flushes = _stats["flushes"]
+    return {
+        **{k: v for k, v in _stats.items() if k != "total_flush_ms"},
+        "mode": "buffered" if _buffered() else "sync",
+        "buffered_rows": len(_rows),
+        "buffered_users": len(_last_push),
+        "dead_letter_size": len(_dead_letters),
+        "linking_tasks": len(_link_tasks),
+        "avg_flush_size": round(_stats["rows_flushed"] / flushes, 1) if flushes else 0,
+        "avg_flush_ms": round(_stats["total_flush_ms"] / flushes, 2) if flushes else 0.0,
+    }
@@ -0,0 +1,232 @@
+import os
+import asyncio
+import traceback
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+from sqlalchemy import select, update, and_, or_, exists
+from sqlalchemy.orm import aliased
+from database import SessionLocal
+from models import User, PushJob
+from github_push import push_code_to_github
+
+# Durable outbox for /push-code in background mode. The job row is written in
+# the same transaction as the PushLog; workers claim jobs with a lease
+# (FOR UPDATE SKIP LOCKED) so pending work survives a restart, and a job is
+# only claimable once every earlier job for the same (user, repo) finished.
+# The worker renews its lease while the push runs; if it still loses the
+# lease (e.g. stalled long enough for another worker to re-claim the job),
+# the claim's attempts number acts as a fencing token and its result is
+# dropped instead of overwriting the newer claim.
+
+PUSH_WORKERS = int(os.getenv("PUSH_WORKERS", "2"))
+PUSH_JOB_MAX_ATTEMPTS = int(os.getenv("PUSH_JOB_MAX_ATTEMPTS", "5"))
+PUSH_JOB_POLL_INTERVAL = float(os.getenv("PUSH_JOB_POLL_INTERVAL", "2"))
+PUSH_JOB_LEASE_SECONDS = float(os.getenv("PUSH_JOB_LEASE_SECONDS", "120"))
+# How often a running job's lease is extended (well inside the lease)
+PUSH_JOB_LEASE_RENEW_SECONDS = float(os.getenv("PUSH_JOB_LEASE_RENEW_SECONDS", str(PUSH_JOB_LEASE_SECONDS / 3)))
+PUSH_JOB_RETRY_BASE = float(os.getenv("PUSH_JOB_RETRY_BASE", "5"))
+
+RETRYABLE_STATUS = {403, 408, 409, 429, 500, 502, 503, 504}
+
+_workers = []
+_wakeup = asyncio.Event()
+_stopping = False
+
+
+def enqueue_push_job(db, user_id: int, repo: str, filename: str, content: str, push_log_id: int = None):
+    """Add a pending job to the caller's session; it becomes visible when the caller commits"""
+    job = PushJob(
+        user_id=user_id,
+        push_log_id=push_log_id,
+        repo=repo,
+        filename=filename,
+        content=content,
+        status="pending",
+        attempts=0
+    )
+    db.add(job)
+    return job
+
+
+def notify_push_workers():
+    _wakeup.set()
+
+
+def serialize_push_job(job: PushJob):
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "repository": job.repo,
+        "filename": job.filename,
+        "attempts": job.attempts,
+        "commit_sha": job.commit_sha,
+        "last_error": job.last_error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None
+    }
+
+
+def claimable_job_query(now: datetime):
+    """Oldest runnable job whose (user, repo) has no earlier open job, locked for the claimer"""
+    earlier = aliased(PushJob)
+    blocked = exists().where(
+        earlier.user_id == PushJob.user_id,
+        earlier.repo == PushJob.repo,
+        earlier.id < PushJob.id,
+        earlier.status.in_(("pending", "running"))
+    )
+    return (
+        select(PushJob)
+        .where(or_(
+            and_(PushJob.status == "pending", PushJob.next_attempt_at <= now),
+            # lease expired: the worker holding it died (e.g. backend restart)
+            and_(PushJob.status == "running", PushJob.locked_until < now)
+        ))
+        .where(~blocked)
+        .order_by(PushJob.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+
+
+async def _claim_next_job():
+    now = datetime.now(timezone.utc)
+    async with SessionLocal() as db:
+        result = await db.execute(claimable_job_query(now))
+        job = result.scalar_one_or_none()
+        if job is None:
+            return None
+        job.status = "running"
+        job.attempts = (job.attempts or 0) + 1
+        job.locked_until = now + timedelta(seconds=PUSH_JOB_LEASE_SECONDS)
+        await db.commit()
+        return job
+
+
+def _owned(job_id: int, claimed_attempts: int):
+    """WHERE clause matching the job only while our claim is still the current one"""
+    return and_(PushJob.id == job_id, PushJob.attempts == claimed_attempts, PushJob.status == "running")
+
+
+async def _finish_job(job_id: int, claimed_attempts: int, **values) -> bool:
+    """Store the outcome of a claim; False (and nothing written) if the job was re-claimed meanwhile"""
+    async with SessionLocal() as db:
+        result = await db.execute(
+            update(PushJob)
+            .where(_owned(job_id, claimed_attempts))
+            .values(locked_until=None, **values)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    if result.rowcount == 0:
+        print(f"[push_outbox.py] Push job {job_id} attempt {claimed_attempts} lost its lease, dropping its result")
+        return False
+    return True
+
+
+async def _renew_lease(job_id: int, claimed_attempts: int):
+    while True:
+        await asyncio.sleep(PUSH_JOB_LEASE_RENEW_SECONDS)
+        try:
+            async with SessionLocal() as db:
+                result = await db.execute(
+                    update(PushJob)
+                    .where(_owned(job_id, claimed_attempts))
+                    .values(locked_until=datetime.now(timezone.utc) + timedelta(seconds=PUSH_JOB_LEASE_SECONDS))
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+        except Exception as e:
+            print(f"[push_outbox.py] Could not renew the lease of push job {job_id}: {str(e)}")
+            continue
+        if result.rowcount == 0:
+            print(f"[push_outbox.py] Push job {job_id} attempt {claimed_attempts} was re-claimed by another worker")
+            return
+
+
+async def _run_job(job: PushJob):
+    print(f"[push_outbox.py] Running push job {job.id} ({job.repo}/{job.filename}), attempt {job.attempts}")
+    renewer = asyncio.create_task(_renew_lease(job.id, job.attempts))
+    try:
+        await _push_job(job)
+    finally:
+        renewer.cancel()
+
+
+async def _push_job(job: PushJob):
+    try:
+        async with SessionLocal() as db:
+            user = await db.get(User, job.user_id)
+            access_token = user.access_token if user else None
+        if not access_token:
+            raise HTTPException(status_code=401, detail="GitHub access token not found")
+
+        status, result = await push_code_to_github(access_token, job.repo, job.filename, job.content)
+        if status not in [200, 201]:
+            raise HTTPException(status_code=status, detail=result.get("message", "Failed to push code to GitHub"))
+
+        commit_sha = (result.get("commit") or {}).get("sha")
+        if await _finish_job(job.id, job.attempts, status="done", commit_sha=commit_sha, last_error=None):
+            print(f"[push_outbox.py] Push job {job.id} done ({commit_sha or 'no change'})")
+
+    except Exception as e:
+        status_code = e.status_code if isinstance(e, HTTPException) else 500
+        error = e.detail if isinstance(e, HTTPException) else str(e)
+        if not isinstance(e, HTTPException):
+            print(traceback.format_exc())
+
+        if status_code in RETRYABLE_STATUS and job.attempts < PUSH_JOB_MAX_ATTEMPTS:
+            delay = PUSH_JOB_RETRY_BASE * (2 ** (job.attempts - 1))
+            print(f"[push_outbox.py] Push job {job.id} failed ({status_code}), retrying in {delay:.0f}s")
+            await _finish_job(
+                job.id,
+                job.attempts,
+                status="pending",
+                last_error=f"{status_code}: {error}",
+                next_attempt_at=datetime.now(timezone.utc) + timedelta(seconds=delay)
+            )
+        else:
+            print(f"[push_outbox.py] Push job {job.id} failed permanently ({status_code}): {error}")
+            await _finish_job(job.id, job.attempts, status="failed", last_error=f"{status_code}: {error}")
+
+
+async def _worker_loop(worker_id: int):
+    print(f"[push_outbox.py] Push worker {worker_id} started")
+    while not _stopping:
+        try:
+            job = await _claim_next_job()
+        except Exception as e:
+            print(f"[push_outbox.py] Worker {worker_id} could not claim a job: {str(e)}")
+            job = None
+
+        if job is None:
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=PUSH_JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            _wakeup.clear()
+            continue
+
+        try:
+            await _run_job(job)
+        except Exception as e:
+            # Leave the lease in place; the job is picked up again once it expires
+            print(f"[push_outbox.py] Worker {worker_id} crashed on job {job.id}: {str(e)}")
+
+
+async def start_push_workers():
+    global _stopping
+    _stopping = False
+    for worker_id in range(PUSH_WORKERS):
+        _workers.append(asyncio.create_task(_worker_loop(worker_id)))
+
+
+async def stop_push_workers(timeout: float = 10.0):
+    global _stopping
+    _stopping = True
+    _wakeup.set()
+    if _workers:
+        done, pending = await asyncio.wait(_workers, timeout=timeout)
+        for task in pending:
+            task.cancel()
+    _workers.clear()
@@ -0,0 +1,139 @@
+import os
+import time
+import hashlib
+from github_client import github_request
+from github_auth import github_headers, invalidate_github_auth, token_key
+from utils.cache import TTLCache
+
+# Snapshot of each selected repository's tree (path -> blob SHA plus the head
+# commit SHA). Loaded with one recursive tree call and kept current from our
+# own successful Contents API PUT responses, so existence checks and
+# "already pushed" detection do not need a per-file GET. Other workers and
+# edits on github.com don't update it, so anything that would skip a write
+# first confirms the head with head_is_current() (a conditional GET, usually
+# a free 304).
+
+GITHUB_API_URL = "https://api.github.com"
+REPO_INDEX_TTL = float(os.getenv("REPO_INDEX_TTL", "3600"))
+REPO_INDEX_CACHE_SIZE = int(os.getenv("REPO_INDEX_CACHE_SIZE", "512"))
+
+_snapshots = TTLCache(maxsize=REPO_INDEX_CACHE_SIZE, ttl=REPO_INDEX_TTL)
+
+
+def git_blob_sha(content: str) -> str:
+    """SHA git would assign to a blob with this content"""
+    data = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _snapshot_key(access_token: str, repo: str):
+    return (token_key(access_token), repo.lower())
+
+
+async def load_repo_index(access_token: str, repo: str):
+    """Fetch the head commit and its recursive tree; returns None if GitHub can't give us one"""
+    headers = await github_headers(access_token)
+
+    head_res = await github_request(
+        "GET", f"{GITHUB_API_URL}/repos/{repo}/commits/HEAD",
+        access_token=access_token, headers=headers, timeout=15.0
+    )
+    if head_res.status_code == 409:
+        # Empty repository - nothing pushed yet
+        snapshot = {"head_sha": None, "paths": {}, "complete": True, "loaded_at": time.time()}
+        _snapshots.set(_snapshot_key(access_token, repo), snapshot)
+        return snapshot
+    if head_res.status_code != 200:
+        print(f"[repo_index.py] Could not resolve HEAD for {repo}: {head_res.status_code}")
+        if head_res.status_code == 401:
+            await invalidate_github_auth(access_token)
+        return None
+
+    head = head_res.json()
+    tree_sha = head["commit"]["tree"]["sha"]
+    tree_res = await github_request(
+        "GET", f"{GITHUB_API_URL}/repos/{repo}/git/trees/{tree_sha}",
+        access_token=access_token,
+        params={"recursive": "1"},
+        headers=headers,
+        timeout=30.0
+    )
+    if tree_res.status_code != 200:
+        print(f"[repo_index.py] Could not load tree for {repo}: {tree_res.status_code}")
+        return None
+
+    tree = tree_res.json()
+    snapshot = {
+        "head_sha": head["sha"],
+        "paths": {e["path"]: e["sha"] for e in tree.get("tree", []) if e.get("type") == "blob"},
+        # A truncated tree can't prove a path is absent
+        "complete": not tree.get("truncated", False),
+        "loaded_at": time.time(),
+    }
+    _snapshots.set(_snapshot_key(access_token, repo), snapshot)
+    print(f"[repo_index.py] Loaded tree index for {repo}: {len(snapshot['paths'])} files at {snapshot['head_sha']}")
+    return snapshot
+
+
+async def get_repo_index(access_token: str, repo: str, load: bool = True):
+    """Return the cached snapshot for a repo, loading it on first use"""
+    snapshot = _snapshots.get(_snapshot_key(access_token, repo))
+    if snapshot is None and load:
+        try:
+            snapshot = await load_repo_index(access_token, repo)
+        except Exception as e:
+            print(f"[repo_index.py] Error loading tree index for {repo}: {str(e)}")
+            return None
+    return snapshot
+
+
+async def head_is_current(access_token: str, repo: str, snapshot: dict):
+    """True if the branch head still is the snapshot's head_sha, False if it moved
+    (the snapshot is dropped), None if GitHub couldn't tell us"""
+    headers = {**(await github_headers(access_token)), "Accept": "application/vnd.github.sha"}
+    try:
+        res = await github_request(
+            "GET", f"{GITHUB_API_URL}/repos/{repo}/commits/HEAD",
+            access_token=access_token, headers=headers, timeout=10.0
+        )
+    except Exception as e:
+        print(f"[repo_index.py] Could not check HEAD for {repo}: {str(e)}")
+        return None
+    if res.status_code != 200:
+        print(f"[repo_index.py] Could not check HEAD for {repo}: {res.status_code}")
+        return None
+    if res.text.strip() == snapshot["head_sha"]:
+        return True
+    print(f"[repo_index.py] HEAD of {repo} moved since the tree index was loaded, dropping it")
+    invalidate_repo_index(access_token, repo)
+    return False
+
+
+def record_pushed_file(access_token: str, repo: str, put_result: dict):
+    """Apply a successful Contents API PUT response to the snapshot"""
+    snapshot = _snapshots.get(_snapshot_key(access_token, repo))
+    if snapshot is None:
+        return
+    content = put_result.get("content") or {}
+    commit = put_result.get("commit") or {}
+    if content.get("path") and content.get("sha"):
+        snapshot["paths"][content["path"]] = content["sha"]
+    if commit.get("sha"):
+        snapshot["head_sha"] = commit["sha"]
+
+
+def record_commit(access_token: str, repo: str, commit_sha: str, paths: dict):
+    """Apply a commit we created through the Git Data API (path -> blob SHA) to the snapshot"""
+    snapshot = _snapshots.get(_snapshot_key(access_token, repo))
+    if snapshot is None:
+        return
+    snapshot["paths"].update(paths)
+    snapshot["head_sha"] = commit_sha
+
+
+def invalidate_repo_index(access_token: str, repo: str):
+    _snapshots.delete(_snapshot_key(access_token, repo))
+
+
+def get_repo_index_stats():
+    return _snapshots.stats()
@@ -0,0 +1,78 @@
+import os
+import json
+import hashlib
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from utils.cache_backend import get_cache
+
+# Cache for read endpoints whose data only changes when someone pushes.
+# Entries are keyed by endpoint + parameters + a "data generation": a global
+# counter (ranking, public profiles) and one per user (/stats, /streak), both
+# bumped when pushes are recorded. A bump makes the old entries unreachable,
+# so nothing has to be purged explicitly; LRU and TTL clean them up.
+# Responses carry a strong ETag (hash of the body) and a matching
+# If-None-Match is answered with 304 and no body.
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2048"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+
+_cache = get_cache("responses", maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+# Kept in the same backend so every worker sees a bump
+_generations = get_cache("generations", maxsize=int(os.getenv("RESPONSE_GENERATIONS_SIZE", "100000")), ttl=0)
+
+_stats = {
+    "not_modified": 0,
+    "bumps": 0,
+}
+
+
+async def bump_generation(user_ids=()):
+    """Called after pushes are committed: invalidates the global views and each user's own views"""
+    await _generations.incr("global")
+    for user_id in user_ids:
+        await _generations.incr(f"user:{user_id}")
+    _stats["bumps"] += 1
+
+
+async def global_generation() -> int:
+    return await _generations.get("global", 0)
+
+
+async def user_generation(user_id: int) -> int:
+    return await _generations.get(f"user:{user_id}", 0)
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in (tag.strip() for tag in header.split(","))
+
+
+async def cached_response(request: Request, key: tuple, build, private: bool = False) -> Response:
+    """Serve key from the cache, calling `await build()` for the JSON payload on a miss.
+
+    key must include the generation the payload depends on.
+    """
+    entry = await _cache.get(key)
+    if entry is None:
+        payload = await build()
+        body = json.dumps(jsonable_encoder(payload), separators=(",", ":"))
+        etag = '"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:32] + '"'
+        entry = {"body": body, "etag": etag}
+        await _cache.set(key, entry)
+    body, etag = entry["body"], entry["etag"]
+
+    headers = {
+        "ETag": etag,
+        # always revalidate; the 304 path is what makes polling cheap
+        "Cache-Control": ("private" if private else "public") + ", no-cache"
+    }
+    if _etag_matches(request, etag):
+        _stats["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def get_response_cache_stats():
+    return {**_cache.stats(), **_stats}
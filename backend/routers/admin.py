@@ -0,0 +1,108 @@
+from fastapi import APIRouter, Body, Depends, HTTPException
+from auth import require_admin, get_jwt_cache_stats, revoke_token
+from current_user import get_current_user_cache_stats
+from database import engine
+from db_metrics import get_db_stats
+from github_client import get_github_client_stats, get_etag_cache_stats
+from github_auth import get_github_auth_cache_stats
+from github_push import get_repo_exists_cache_stats
+from repo_index import get_repo_index_stats
+from push_coalescer import get_push_coalescer_stats
+from github_ratelimit import get_rate_limit_stats
+from github_resilience import get_resilience_stats
+from routers.push import get_push_dedup_stats
+from push_log import get_push_log_stats, get_dead_letter_push_logs
+from problem_catalog import publish_problem_catalog_reload, get_problem_catalog_stats
+from utils.leetcode import get_leetcode_lookup_stats
+from response_cache import get_response_cache_stats
+from utils.cache_backend import get_cache_backend_stats
+
+# Every route requires an admin token (ADMIN_GITHUB_IDS)
+admin_router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+@admin_router.get("/metrics/github-client")
+async def github_client_metrics():
+    return get_github_client_stats()
+
+@admin_router.get("/metrics/github-auth-cache")
+async def github_auth_cache_metrics():
+    return get_github_auth_cache_stats()
+
+@admin_router.get("/metrics/repo-exists-cache")
+async def repo_exists_cache_metrics():
+    return get_repo_exists_cache_stats()
+
+@admin_router.get("/metrics/repo-index")
+async def repo_index_metrics():
+    return get_repo_index_stats()
+
+@admin_router.get("/metrics/push-coalescer")
+async def push_coalescer_metrics():
+    return get_push_coalescer_stats()
+
+@admin_router.get("/metrics/github-rate-limits")
+async def github_rate_limit_metrics():
+    return get_rate_limit_stats()
+
+@admin_router.get("/metrics/github-etag-cache")
+async def github_etag_cache_metrics():
+    return get_etag_cache_stats()
+
+@admin_router.get("/metrics/github-resilience")
+async def github_resilience_metrics():
+    return get_resilience_stats()
+
+@admin_router.get("/metrics/push-dedup")
+async def push_dedup_metrics():
+    return get_push_dedup_stats()
+
+@admin_router.get("/metrics/push-log")
+async def push_log_metrics():
+    return get_push_log_stats()
+
+@admin_router.get("/metrics/problem-catalog")
+async def problem_catalog_metrics():
+    return get_problem_catalog_stats()
+
+@admin_router.post("/problem-catalog/reload")
+async def reload_problem_catalog():
+    """Pick up problems loaded with scripts/load_problems.py without a restart, in every worker"""
+    size = await publish_problem_catalog_reload()
+    return {"message": "Problem catalog reloaded", "size": size}
+
+@admin_router.get("/metrics/leetcode-lookups")
+async def leetcode_lookup_metrics():
+    return get_leetcode_lookup_stats()
+
+@admin_router.get("/metrics/response-cache")
+async def response_cache_metrics():
+    return get_response_cache_stats()
+
+@admin_router.get("/metrics/cache-backends")
+async def cache_backend_metrics():
+    return get_cache_backend_stats()
+
+@admin_router.get("/metrics/jwt-cache")
+async def jwt_cache_metrics():
+    return get_jwt_cache_stats()
+
+@admin_router.post("/tokens/revoke")
+async def revoke_jwt(token: str = Body(..., embed=True)):
+    """Refuse a leaked token in every worker until it would have expired"""
+    if not await revoke_token(token):
+        raise HTTPException(status_code=400, detail="Token is invalid or already expired")
+    return {"message": "Token revoked"}
+
+@admin_router.get("/metrics/current-user-cache")
+async def current_user_cache_metrics():
+    return get_current_user_cache_stats()
+
+@admin_router.get("/metrics/db")
+async def db_metrics(top: int = 20):
+    """Pool saturation (checked out, overflow, wait for a connection) and the costliest statements"""
+    return get_db_stats(engine.sync_engine, top)
+
+@admin_router.get("/push-log/dead-letters")
+async def push_log_dead_letters():
+    """Buffered push logs the database kept rejecting (e.g. their user was deleted)"""
+    return get_dead_letter_push_logs()
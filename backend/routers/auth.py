@@ -5,7 +5,8 @@ from sqlalchemy import select
 from models import User, PushLog, Problem, Solution
 from database import SessionLocal, get_db
 from github_oauth import exchange_code_for_token, get_user_info
-from auth import create_access_token, verify_token, create_jwt_token
+from auth import create_access_token, verify_token, create_jwt_token, revoke_token
+from current_user import invalidate_current_user
 from fastapi.responses import JSONResponse, Response
 import jwt
 from datetime import datetime, timedelta
@@ -66,9 +67,11 @@ async def github_callback(code: str, db: AsyncSession = Depends(get_db)):
 
         await db.commit()
         await db.refresh(user)
+        # new access token (and maybe username) - drop the cached record
+        invalidate_current_user(github_id)
 
-        # Create JWT token
-        jwt_token = create_jwt_token({"github_id": github_id})
+        # Create JWT token; uid lets read endpoints skip the users lookup
+        jwt_token = create_jwt_token({"github_id": github_id, "uid": user.id})
         
         # Format dates for the response
         last_login_str = user.last_login.isoformat() if user.last_login else None
@@ -117,7 +120,16 @@ async def github_callback(code: str, db: AsyncSession = Depends(get_db)):
 
 async def get_current_user(authorization: str = Header(...)):
     token = authorization.replace("Bearer ", "")
-    payload = verify_token(token)
+    payload = await verify_token(token)
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid Token")
-    return payload
\ No newline at end of file
+    return payload
+
+
+@auth_router.post("/logout")
+async def logout(authorization: str = Header(...)):
+    """Revoke the caller's token in every worker until it would have expired"""
+    token = authorization.replace("Bearer ", "")
+    if not await revoke_token(token):
+        raise HTTPException(status_code=401, detail="Invalid Token")
+    return {"message": "Logged out"}
\ No newline at end of file
@@ -1,28 +1,56 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Body
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from models import User, PushLog, Problem, Solution
-from database import get_db
+from sqlalchemy import select, update, func
+from models import User, PushLog, Problem, Solution, PushJob
+from database import get_db, SessionLocal
 from auth import get_current_user
-from github_push import push_code_to_github, repo_exists, create_repo
-from github_oauth import get_user_info
-from utils.leetcode import get_problem_difficulty
+from current_user import CurrentUser, get_current_user_record, get_current_user_id, invalidate_current_user
+from github_push import push_code_to_github, push_files_to_github, repo_exists, create_repo
+from repo_index import get_repo_index, invalidate_repo_index
+from push_coalescer import coalesced_push
+from github_resilience import GitHubUnavailable
+from push_outbox import enqueue_push_job, notify_push_workers, serialize_push_job
+from push_log import record_push, push_log_row, attach_problems, link_problems_later, apply_push_aggregates
+from response_cache import bump_generation
+from github_auth import resolve_github_auth
+from utils.cache import TTLCache
+from utils.singleflight import SingleFlight
+import os
 import base64
+import hashlib
 import httpx
-from datetime import datetime
+from datetime import datetime, timezone
 import traceback
 import logging
 
 # Add prefix to the router
 push_router = APIRouter(prefix="", tags=["push"])
 
+PUSH_IDEMPOTENCY_TTL = float(os.getenv("PUSH_IDEMPOTENCY_TTL", "600"))
+
+# Concurrent identical pushes share one operation; Idempotency-Key replays get the stored result
+_push_flights = SingleFlight()
+_idempotent_results = TTLCache(maxsize=int(os.getenv("PUSH_IDEMPOTENCY_CACHE_SIZE", "4096")), ttl=PUSH_IDEMPOTENCY_TTL)
+
 # Define a model for the request body
 class PushCodeRequest(BaseModel):
     filename: str = Field(..., description="Filename for the code file")
     code: str = Field(..., description="Code to be pushed")
     selected_repo: str = Field(..., description="Repository to push to (username/repo format)")
+    background: bool = Field(False, description="Queue the push and return 202 with a job id")
+
+class PushFileItem(BaseModel):
+    filename: str = Field(..., description="Path of the file in the repository")
+    code: str = Field(..., description="File content")
+    track: bool = Field(True, description="Record a PushLog for this file (false for README/index files)")
+
+class PushFilesRequest(BaseModel):
+    files: List[PushFileItem] = Field(..., min_length=1, description="Files to commit together")
+    selected_repo: str = Field(..., description="Repository to push to (username/repo format)")
+    message: Optional[str] = Field(None, description="Commit message")
 
 # Define a model for the save repository request
 class SaveRepositoryRequest(BaseModel):
@@ -73,8 +101,7 @@ async def save_repository(
         # Verify access token
         access_token = user_obj.access_token
 
-        user_info = await get_user_info(access_token)
-        github_username = user_info.get("login")
+        github_username = (await resolve_github_auth(access_token))["login"]
 
         # Check if repository exists
         if not await repo_exists(access_token, selected_repo):
@@ -94,9 +121,8 @@ async def save_repository(
                 repo_owner, repo_name = repo_parts
                 print(f"[push.py] Repository not found: {repository}")
                 
-                # Get GitHub username
-                user_info = await get_user_info(access_token)
-                github_username = user_info.get("login")
+                # Get GitHub username (served from the per-token auth cache)
+                github_username = (await resolve_github_auth(access_token))["login"]
                 
                 if repo_owner == github_username:
                     # User is the owner, try to create the repo
@@ -130,6 +156,7 @@ async def save_repository(
         # Update user's selected repository
         user_obj.selected_repo = repository
         await db.commit()
+        invalidate_current_user(github_id)
         
         return {
             "message": "Repository saved successfully",
@@ -144,29 +171,85 @@ async def save_repository(
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
 
+async def _queue_push(db: AsyncSession, user_id: int, selected_repo: str, data: PushCodeRequest):
+    """Write the PushLog and the outbox job in one transaction; a worker does the GitHub calls"""
+    pushed_at = datetime.now(timezone.utc)
+    row = push_log_row(user_id, data.filename, pushed_at)
+    unlinked = attach_problems([row])
+    push_log = PushLog(**row)
+    db.add(push_log)
+    await db.flush()
+    # aggregates first and users last, the same lock order as push_log._write
+    await apply_push_aggregates(db, user_id, [row])
+    await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(last_push=func.greatest(User.last_push, pushed_at))
+    )
+    job = enqueue_push_job(db, user_id, selected_repo, data.filename, data.code, push_log_id=push_log.id)
+    await db.commit()
+    await bump_generation([user_id])
+    link_problems_later(unlinked)
+    notify_push_workers()
+    return JSONResponse(
+        status_code=202,
+        content={"message": "Push queued", "repository": selected_repo, "job_id": job.id}
+    )
+
+async def _push_and_record(user_id: int, access_token: str, selected_repo: str, data: PushCodeRequest):
+    """Push one file and record it; shared by identical concurrent /push-code requests.
+
+    Does not touch the request's session so it does not depend on whichever request started it.
+    """
+    # Push code to GitHub (bursts to the same repo are merged into one commit)
+    try:
+        status, result = await coalesced_push(
+            user_id=user_id,
+            access_token=access_token,
+            repo=selected_repo,
+            filename=data.filename,
+            content=data.code
+        )
+    except GitHubUnavailable:
+        # Circuit breaker is open - hand the push to the outbox instead of failing it
+        print(f"[push.py] GitHub unavailable, deferring push of {data.filename} to the outbox")
+        async with SessionLocal() as db:
+            return await _queue_push(db, user_id, selected_repo, data)
+
+    if status not in [200, 201]:
+        raise HTTPException(status_code=status, detail=result.get("message", "Failed to push code to GitHub"))
+
+    # Update last push time and create the push log (one transaction, or buffered)
+    await record_push(user_id, [data.filename])
+
+    return {
+        "message": "Code pushed successfully",
+        "repository": selected_repo,
+        "commit_sha": (result.get("commit") or {}).get("sha")
+    }
+
+def _push_flight_key(user_id: int, repo: str, filename: str, content: str):
+    digest = hashlib.sha256(f"{user_id}\0{repo.lower()}\0{filename}\0{content}".encode("utf-8")).hexdigest()
+    return digest
+
+def _idempotency_fingerprint(repo: str, data: PushCodeRequest):
+    """What an Idempotency-Key is bound to; a replay must send the same request"""
+    return hashlib.sha256(
+        f"{repo.lower()}\0{data.filename}\0{data.code}\0{bool(data.background)}".encode("utf-8")
+    ).hexdigest()
+
 @push_router.post("/push-code")
 async def push_code(
     request: Request,
     data: PushCodeRequest = Body(...),
-    user=Depends(get_current_user),
+    user_obj: CurrentUser = Depends(get_current_user_record),
     db: AsyncSession = Depends(get_db)
 ):
     try:
         # Log the incoming request for debugging
-        print(f"[push.py] Received push request from user: {user}")
+        print(f"[push.py] Received push request from user: {user_obj.username}")
         print(f"[push.py] Request data: {data}")
         
-        # Get user from database
-        github_id = user.get("github_id")
-        if not github_id:
-            raise HTTPException(status_code=401, detail="GitHub ID not found in token")
-            
-        result = await db.execute(select(User).where(User.github_id == github_id))
-        user_obj = result.scalar_one_or_none()
-        
-        if not user_obj:
-            raise HTTPException(status_code=404, detail="User not found in database")
-            
         # Get access token
         access_token = user_obj.access_token
         if not access_token:
@@ -177,31 +260,36 @@ async def push_code(
         if not selected_repo:
             raise HTTPException(status_code=400, detail="No repository selected")
             
-        # Push code to GitHub
-        status, result = await push_code_to_github(
-            access_token=access_token,
-            repo=selected_repo,
-            filename=data.filename,
-            content=data.code
-        )
-        
-        if status in [200, 201]:
-            # Update last push time
-            user_obj.last_push = datetime.utcnow()
-            await db.commit()
-            
-            # Create push log
-            push_log = PushLog(
-                user_id=user_obj.id,
-                filename=data.filename,
-                language=data.filename.split('.')[-1]
-            )
-            db.add(push_log)
-            await db.commit()
+        # Replays of a request the client already sent get the stored result;
+        # reusing a key for a different request is a client bug, not a replay
+        idempotency_key = request.headers.get("Idempotency-Key")
+        if idempotency_key:
+            fingerprint = _idempotency_fingerprint(selected_repo, data)
+            stored = _idempotent_results.get((user_obj.id, idempotency_key))
+            if stored is not None:
+                stored_fingerprint, stored_response = stored
+                if stored_fingerprint != fingerprint:
+                    raise HTTPException(
+                        status_code=422,
+                        detail="Idempotency-Key was already used for a different request"
+                    )
+                print(f"[push.py] Replaying stored result for idempotency key {idempotency_key[:16]}")
+                return stored_response
             
-            return {"message": "Code pushed successfully", "repository": selected_repo}
+        if data.background:
+            response = await _queue_push(db, user_obj.id, selected_repo, data)
         else:
-            raise HTTPException(status_code=status, detail=result.get("message", "Failed to push code to GitHub"))
+            # Identical pushes already in flight (button + auto-push + Ctrl+M) share one operation
+            flight_key = _push_flight_key(user_obj.id, selected_repo, data.filename, data.code)
+            user_id = user_obj.id
+            response = await _push_flights.do(
+                flight_key,
+                lambda: _push_and_record(user_id, access_token, selected_repo, data)
+            )
+        
+        if idempotency_key:
+            _idempotent_results.set((user_obj.id, idempotency_key), (fingerprint, response))
+        return response
             
     except HTTPException as he:
         print(f"[push.py] HTTP Exception: {he.status_code} - {he.detail}")
@@ -210,3 +298,87 @@ async def push_code(
         print(f"[push.py] Unexpected error: {str(e)}")
         logging.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=str(e))
+
+@push_router.post("/push-code/batch")
+async def push_code_batch(
+    data: PushFilesRequest = Body(...),
+    user_obj: CurrentUser = Depends(get_current_user_record)
+):
+    """Push several files (solution, explanation, index) as a single commit"""
+    try:
+        access_token = user_obj.access_token
+        if not access_token:
+            raise HTTPException(status_code=401, detail="GitHub access token not found")
+
+        selected_repo = data.selected_repo or user_obj.selected_repo
+        if not selected_repo:
+            raise HTTPException(status_code=400, detail="No repository selected")
+
+        files = {f.filename: f.code for f in data.files}
+        if len(files) != len(data.files):
+            raise HTTPException(status_code=400, detail="Duplicate filenames in batch")
+
+        status, result = await push_files_to_github(access_token, selected_repo, files, data.message)
+
+        if status == 201:
+            await record_push(user_obj.id, [f.filename for f in data.files if f.track])
+            return {"message": "Files pushed successfully", "repository": selected_repo, **result}
+        return {"message": result.get("message", "No change"), "repository": selected_repo}
+
+    except HTTPException as he:
+        print(f"[push.py] HTTP Exception: {he.status_code} - {he.detail}")
+        raise he
+    except Exception as e:
+        print(f"[push.py] Unexpected error: {str(e)}")
+        logging.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=str(e))
+
+@push_router.get("/pushed-solutions")
+async def list_pushed_solutions(
+    path: str = None,
+    refresh: bool = False,
+    user_obj: CurrentUser = Depends(get_current_user_record)
+):
+    """List files in the user's selected repo from the tree snapshot (no per-file GitHub calls)"""
+    if not user_obj.selected_repo:
+        raise HTTPException(status_code=400, detail="No repository selected")
+
+    if refresh:
+        invalidate_repo_index(user_obj.access_token, user_obj.selected_repo)
+    index = await get_repo_index(user_obj.access_token, user_obj.selected_repo)
+    if index is None:
+        raise HTTPException(status_code=502, detail="Could not load repository tree from GitHub")
+
+    if path is not None:
+        sha = index["paths"].get(path)
+        return {
+            "repository": user_obj.selected_repo,
+            "path": path,
+            "exists": sha is not None,
+            "sha": sha
+        }
+
+    return {
+        "repository": user_obj.selected_repo,
+        "head_sha": index["head_sha"],
+        "complete": index["complete"],
+        "files": sorted(index["paths"].keys())
+    }
+
+@push_router.get("/push-jobs/{job_id}")
+async def get_push_job(
+    job_id: int,
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Status of a queued push"""
+    result = await db.execute(
+        select(PushJob).where(PushJob.id == job_id, PushJob.user_id == user_id)
+    )
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=404, detail="Push job not found")
+    return serialize_push_job(job)
+
+def get_push_dedup_stats():
+    return {"single_flight": _push_flights.stats(), "idempotency_cache": _idempotent_results.stats()}
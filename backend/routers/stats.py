@@ -1,62 +1,55 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from models import User, PushLog, Problem, Solution
+from typing import Optional
+from models import UserStats
 from database import get_db
-from auth import get_current_user
-from utils.leetcode import get_problem_difficulty
-import logging
+from current_user import get_current_user_id
+from leaderboard import encode_cursor, ranking_query
+from user_stats import serialize_user_stats
+from response_cache import cached_response, global_generation, user_generation
 
 
 stats_router = APIRouter()
 
 @stats_router.get("/stats")
-async def get_stats(user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    github_id = user.get("github_id")
-    result = await db.execute(select(User).where(User.github_id == github_id))
-    user_obj = result.scalar_one()
-    logs = await db.execute(select(PushLog).where(PushLog.user_id == user_obj.id))
-    log_list = [l for l in logs.scalars().all() if l.timestamp is not None]
+async def get_stats(request: Request, user_id: int = Depends(get_current_user_id), db: AsyncSession = Depends(get_db)):
+    async def build():
+        stats = await db.get(UserStats, user_id)
+        return serialize_user_stats(stats)
 
-    return {
-        "total_solved": len(log_list),
-        "by_language": {
-            lang: sum(1 for l in log_list if l.language == lang)
-            for lang in set(l.language for l in log_list)
-        },
-        "recent": [
-            {"filename": l.filename, "timestamp": l.timestamp.isoformat()}
-            for l in sorted(log_list, key=lambda x: x.timestamp, reverse=True)[:5]
-        ]
-    }
+    return await cached_response(request, ("stats", user_id, await user_generation(user_id)), build, private=True)
 
 @stats_router.get("/ranking")
-async def get_ranking(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(User))
-    users = result.scalars().all()
-    rankings = []
-
-    for user in users:
-        logs_result = await db.execute(select(PushLog).where(PushLog.user_id == user.id))
-        logs = logs_result.scalars().all()
-        lang_count = {}
-        total_point = 0
-
-        for log in logs:
-            lang_count[log.language] = lang_count.get(log.language, 0) + 1
-            # Extract slug from filename
-            slug = log.filename.split("_", 1)[-1].rsplit(".", 1)[0].replace("_", "-").lower()
-            prob_result = await db.execute(select(Problem).where(Problem.slug == slug))
-            prob = prob_result.scalar_one_or_none()
-            if prob:
-                total_point += prob.point or 0
+async def get_ranking(
+    request: Request,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Leaderboard page in (total_point desc, user_id) order; pass next_cursor back for the next page"""
+    return await cached_response(
+        request,
+        ("ranking", limit, cursor, await global_generation()),
+        lambda: _build_ranking(db, limit, cursor)
+    )
+
+async def _build_ranking(db: AsyncSession, limit: int, cursor: Optional[str]):
+    rows = (await db.execute(ranking_query(limit, cursor))).all()
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1][0]
+        next_cursor = encode_cursor(last.total_point, last.user_id)
 
-        rankings.append({
-            "username": user.username,
-            "total_solved": len(logs),
-            "by_language": lang_count,
-            "total_point": total_point
-        })
-
-    rankings.sort(key=lambda x: x["total_point"], reverse=True)
-    return {"ranking": rankings}
+    return {
+        "ranking": [
+            {
+                "username": username,
+                "total_solved": entry.total_solved,
+                "by_language": entry.by_language or {},
+                "total_point": entry.total_point
+            }
+            for entry, username in page
+        ],
+        "next_cursor": next_cursor
+    }
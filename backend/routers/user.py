@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
-from models import User, PushLog, Problem, Solution
+from models import User, UserStats
 from database import get_db
 from auth import get_current_user
-from datetime import datetime, timedelta
+from current_user import get_current_user_id, invalidate_current_user
+from datetime import datetime, timezone, date
+from typing import Optional
 from pydantic import BaseModel
+from user_stats import serialize_user_stats, user_detail_query
+from response_cache import cached_response, global_generation, user_generation
+from activity import current_streak, activity_between, MAX_FROZEN_DAYS
+from user_search import search_users, SEARCH_MAX_LIMIT, TYPEAHEAD_MAX_LIMIT
 
 user_router = APIRouter(prefix="", tags=["user"])
 
@@ -27,6 +33,7 @@ async def save_repository(
         .values(selected_repo=repo_data.repository)
     )
     await db.commit()
+    invalidate_current_user(github_id)
     
     return {"message": "Repository updated successfully", "repository": repo_data.repository}
 
@@ -49,66 +56,76 @@ async def read_me(user=Depends(get_current_user), db: AsyncSession = Depends(get
 
 
 @user_router.get("/search")
-async def search_user(username: str, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(User).where(User.username.ilike(f"%{username}%")))
-    users = result.scalars().all()
-
-    return {
-        "results": [
-            {
-                "username": u.username,
-                "total_solved": len(u.push_logs) if u.push_logs else 0
-            } for u in users
-        ]
-    }
+async def search_user(
+    request: Request,
+    username: str = Query(..., min_length=1, max_length=100),
+    limit: Optional[int] = Query(None, ge=1, le=SEARCH_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    typeahead: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """Username search; typeahead=true does a prefix match with a small page for per-keystroke lookups"""
+    if typeahead:
+        limit = min(limit or 8, TYPEAHEAD_MAX_LIMIT)
+    else:
+        limit = limit or 20
+    key = ("search", username.strip().lower(), typeahead, limit, cursor, await global_generation())
+    return await cached_response(
+        request, key, lambda: search_users(db, username, limit, cursor, prefix=typeahead)
+    )
 
 @user_router.get("/streak")
-async def get_streak(user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    github_id = user.get("github_id")
-    result = await db.execute(select(User).where(User.github_id == github_id))
-    user_obj = result.scalar_one_or_none()
+async def get_streak(request: Request, user_id: int = Depends(get_current_user_id), db: AsyncSession = Depends(get_db)):
+    # the streak also moves with the date, not just with pushes
+    today = datetime.now(timezone.utc).date()
+    key = ("streak", user_id, await user_generation(user_id), today)
+    return await cached_response(request, key, lambda: _build_streak(db, user_id, today), private=True)
 
-    if not user_obj:
-        raise HTTPException(status_code=404, detail="User not found")
 
-    logs = await db.execute(select(PushLog).where(PushLog.user_id == user_obj.id))
-    log_list = logs.scalars().all()
-    solved_dates = set(log.timestamp.date() for log in log_list)
+async def _build_streak(db: AsyncSession, user_id: int, today: date):
+    streak = await current_streak(db, user_id, today)
+    stats = await db.get(UserStats, user_id)
+    longest = max(stats.longest_streak if stats else 0, streak["streak"])
+    return {**streak, "longest_streak": longest, "max_frozen": MAX_FROZEN_DAYS}
 
-    streak, frozen = 0, 0
-    day = datetime.today().date()
 
-    while True:
-        if day in solved_dates:
-            streak += 1
-        else:
-            frozen += 1
-            if frozen > 4:
-                break
-        day -= timedelta(days=1)
+@user_router.get("/heatmap")
+async def get_heatmap(
+    request: Request,
+    year: Optional[int] = Query(None, ge=2000, le=2100),
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Push counts per day for one calendar year (UTC), for a contribution-style heatmap"""
+    year = year or datetime.now(timezone.utc).year
+    key = ("heatmap", user_id, await user_generation(user_id), year)
+    return await cached_response(request, key, lambda: _build_heatmap(db, user_id, year), private=True)
+
 
-    return {"streak": streak, "frozen_used": min(frozen, 4)}
+async def _build_heatmap(db: AsyncSession, user_id: int, year: int):
+    days = await activity_between(db, user_id, date(year, 1, 1), date(year, 12, 31))
+    return {
+        "year": year,
+        "total": sum(days.values()),
+        "active_days": len(days),
+        "days": {day.isoformat(): count for day, count in days.items()}
+    }
 
 
 @user_router.get("/user/{username}")
-async def get_user_detail(username: str, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(User).where(User.username == username))
-    user = result.scalar_one_or_none()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+async def get_user_detail(request: Request, username: str, db: AsyncSession = Depends(get_db)):
+    return await cached_response(
+        request,
+        ("user", username, await global_generation()),
+        lambda: _build_user_detail(db, username)
+    )
 
-    logs = await db.execute(select(PushLog).where(PushLog.user_id == user.id))
-    log_list = logs.scalars().all()
 
-    return {
-        "username": user.username,
-        "total_solved": len(log_list),
-        "by_language": {
-            lang: sum(1 for l in log_list if l.language == lang)
-            for lang in set(l.language for l in log_list)
-        },
-        "recent": [
-            {"filename": l.filename, "timestamp": l.timestamp.isoformat()}
-            for l in sorted(log_list, key=lambda x: x.timestamp, reverse=True)[:5]
-        ]
-    }
\ No newline at end of file
+async def _build_user_detail(db: AsyncSession, username: str):
+    result = await db.execute(user_detail_query(username))
+    row = result.one_or_none()
+    if not row:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    found_username, stats = row
+    return {"username": found_username, **serialize_user_stats(stats)}
@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from itertools import groupby
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, select, update, text
+from sqlalchemy.orm import sessionmaker
+
+from models import ActivityDay, UserStats
+from activity import longest_streak
+
+# Rebuild activity_days (one row per user and UTC day with pushes) from
+# push_logs, then recompute user_stats.longest_streak from it. Run once after
+# deploying the activity_days migration; safe to re-run.
+
+# Load environment variables
+def get_database_url():
+    env_path = os.getenv("ENV_PATH")
+    if env_path:
+        print(f"[backfill_activity_days.py] Loading custom ENV_PATH: {env_path}")
+        load_dotenv(env_path)
+        return os.getenv("DATABASE_URL", "").replace("+asyncpg", "").replace("@db", "@localhost")
+    else:
+        print("[backfill_activity_days.py] Loading default .env/.env.railway")
+        load_dotenv(".env")
+        return os.getenv("DATABASE_URL", "").replace("+asyncpg", "")
+
+DATABASE_URL = get_database_url()
+print(f"[backfill_activity_days.py] Using DATABASE_URL: {DATABASE_URL}")
+
+
+engine = create_engine(DATABASE_URL)
+SessionLocal = sessionmaker(bind=engine)
+
+
+def backfill_activity_days():
+    db = SessionLocal()
+    try:
+        # Same ordering argument as rebuild_leaderboard.py
+        db.execute(text("LOCK TABLE activity_days IN EXCLUSIVE MODE"))
+        db.execute(text("DELETE FROM activity_days"))
+        result = db.execute(text("""
+            INSERT INTO activity_days (user_id, day, count)
+            SELECT user_id, (timestamp AT TIME ZONE 'UTC')::date, count(*)
+            FROM push_logs
+            WHERE user_id IS NOT NULL AND timestamp IS NOT NULL
+            GROUP BY 1, 2
+        """))
+        print(f"Inserted {result.rowcount} activity days.")
+
+        rows = db.execute(
+            select(ActivityDay.user_id, ActivityDay.day).order_by(ActivityDay.user_id, ActivityDay.day)
+        )
+        updated = 0
+        for user_id, group in groupby(rows, key=lambda row: row[0]):
+            days = [day for _, day in group]
+            db.execute(
+                update(UserStats)
+                .where(UserStats.user_id == user_id)
+                .values(longest_streak=longest_streak(days))
+            )
+            updated += 1
+        db.commit()
+        print(f"Longest streak recomputed for {updated} users.")
+    except Exception as e:
+        db.rollback()
+        print("Error:", e)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    backfill_activity_days()
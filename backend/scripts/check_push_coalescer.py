@@ -0,0 +1,77 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import asyncio
+
+import push_coalescer
+
+# Self-check for push_coalescer with the GitHub calls stubbed out (no network,
+# no database). Exits 1 if a scenario does not produce the expected commits:
+#
+#   python scripts/check_push_coalescer.py
+
+PUSH_MS = 50
+
+_calls = []
+
+
+async def _fake_push_one(access_token, repo, filename, content):
+    _calls.append([filename])
+    await asyncio.sleep(PUSH_MS / 1000)
+    return 201, {"commit": {"sha": f"sha-{len(_calls)}"}}
+
+
+async def _fake_push_many(access_token, repo, files, message=None):
+    _calls.append(sorted(files))
+    await asyncio.sleep(PUSH_MS / 1000)
+    return 201, {"commit": {"sha": f"sha-{len(_calls)}"}}
+
+
+push_coalescer.push_code_to_github = _fake_push_one
+push_coalescer.push_files_to_github = _fake_push_many
+
+
+async def _push_at(delay_ms: float, filename: str):
+    await asyncio.sleep(delay_ms / 1000)
+    return await push_coalescer.coalesced_push(1, "token", "user/repo", filename, filename)
+
+
+async def _scenario(name: str, window_ms: float, schedule: list, expected: list) -> bool:
+    """schedule: (ms after start, filename); expected: the files of each commit, in order"""
+    push_coalescer.PUSH_COALESCE_WINDOW_MS = window_ms
+    _calls.clear()
+    await asyncio.gather(*[_push_at(delay, filename) for delay, filename in schedule])
+    ok = _calls == expected and not push_coalescer._pending and not push_coalescer._busy
+    print(f"  [{'ok' if ok else 'FAIL'}] {name}: {_calls}" + ("" if ok else f" (expected {expected})"))
+    return ok
+
+
+async def main() -> bool:
+    results = [
+        await _scenario("single push goes out alone", 0, [(0, "f0")], [["f0"]]),
+        await _scenario(
+            "writes during a running push share the next commit", 0,
+            [(0, "f0"), (10, "f1"), (20, "f2")],
+            [["f0"], ["f1", "f2"]]
+        ),
+        # f1 queues behind f0; f0 finishes at ~50ms and f1's batch is held
+        # until ~250ms, so f2 / f3 arriving inside that window must join it
+        await _scenario(
+            "writes inside the window join the held batch", 200,
+            [(0, "f0"), (10, "f1"), (120, "f2"), (180, "f3")],
+            [["f0"], ["f1", "f2", "f3"]]
+        ),
+        await _scenario(
+            "writes during the batch's push start the next one", 100,
+            [(0, "f0"), (10, "f1"), (170, "f2")],
+            [["f0"], ["f1"], ["f2"]]
+        ),
+    ]
+    return all(results)
+
+
+if __name__ == "__main__":
+    print("[check_push_coalescer.py] Running coalescer scenarios with stubbed GitHub calls")
+    passed = asyncio.run(main())
+    sys.exit(0 if passed else 1)
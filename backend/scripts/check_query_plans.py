@@ -0,0 +1,157 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import json
+import argparse
+from datetime import date, datetime, timezone
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, select, text
+
+from models import UserStats
+from leaderboard import ranking_query, encode_cursor
+from user_stats import user_detail_query
+from user_search import search_users_query, encode_search_cursor
+from activity import streak_days_query, activity_between_query
+from current_user import current_user_query
+from push_outbox import claimable_job_query
+
+# Query-plan regression check for the hot read paths. Seeds a synthetic
+# dataset inside a transaction, ANALYZEs it, runs EXPLAIN on the statements
+# built by the same query builders the routers and push workers use, and
+# fails (exit code 1) if any of them plans a sequential scan on one of the
+# big tables. Everything is rolled back at the end, so it can run against a
+# dev database:
+#
+#   python scripts/check_query_plans.py
+#   python scripts/check_query_plans.py --users 20000 --logs-per-user 50
+
+# Load environment variables
+def get_database_url():
+    env_path = os.getenv("ENV_PATH")
+    if env_path:
+        print(f"[check_query_plans.py] Loading custom ENV_PATH: {env_path}")
+        load_dotenv(env_path)
+        return os.getenv("DATABASE_URL", "").replace("+asyncpg", "").replace("@db", "@localhost")
+    else:
+        print("[check_query_plans.py] Loading default .env/.env.railway")
+        load_dotenv(".env")
+        return os.getenv("DATABASE_URL", "").replace("+asyncpg", "")
+
+DATABASE_URL = get_database_url()
+print(f"[check_query_plans.py] Using DATABASE_URL: {DATABASE_URL}")
+
+
+engine = create_engine(DATABASE_URL)
+
+# A sequential scan on any of these is a regression
+WATCHED_TABLES = {"users", "push_logs", "push_jobs", "leaderboard", "user_stats", "activity_days"}
+
+SEED_SQL = [
+    """
+    INSERT INTO users (github_id, username, access_token)
+    SELECT 'qp-' || g, 'qp_user_' || g, 'qp-token'
+    FROM generate_series(1, :users) g
+    """,
+    """
+    INSERT INTO push_logs (user_id, filename, language, timestamp, problem_slug, point)
+    SELECT u.id, lpad(n::text, 4, '0') || '_Problem_' || n || '.py', 'py',
+           now() - (n || ' hours')::interval, 'problem-' || n, 1 + n % 3
+    FROM users u CROSS JOIN generate_series(1, :logs) n
+    WHERE u.username LIKE 'qp\\_user\\_%'
+    """,
+    """
+    INSERT INTO leaderboard (user_id, total_solved, total_point, by_language)
+    SELECT user_id, count(*), sum(point), '{}'::json FROM push_logs GROUP BY user_id
+    ON CONFLICT (user_id) DO NOTHING
+    """,
+    """
+    INSERT INTO user_stats (user_id, total_solved, by_language, recent)
+    SELECT user_id, count(*), '{}'::json, '[]'::json FROM push_logs GROUP BY user_id
+    ON CONFLICT (user_id) DO NOTHING
+    """,
+    """
+    INSERT INTO activity_days (user_id, day, count)
+    SELECT user_id, (timestamp AT TIME ZONE 'UTC')::date, count(*) FROM push_logs GROUP BY 1, 2
+    ON CONFLICT (user_id, day) DO NOTHING
+    """,
+    """
+    INSERT INTO push_jobs (user_id, repo, filename, content, status, attempts)
+    SELECT u.id, 'qp/repo', 'f.py', 'pass', CASE WHEN n = 1 THEN 'pending' ELSE 'done' END, 1
+    FROM users u CROSS JOIN generate_series(1, 4) n
+    WHERE u.username LIKE 'qp\\_user\\_%'
+    """,
+]
+
+
+def hot_queries(user_id: int, username: str, github_id: str):
+    """(name, statement) pairs from the builders the routers / workers run"""
+    today = datetime.now(timezone.utc).date()
+
+    return [
+        ("current user by github_id (auth)", current_user_query(github_id)),
+        ("/ranking page", ranking_query(50)),
+        ("/ranking next page", ranking_query(50, encode_cursor(40, user_id))),
+        # what db.get(UserStats, user_id) sends
+        ("/stats", select(UserStats).where(UserStats.user_id == user_id)),
+        ("/user/{username}", user_detail_query(username)),
+        ("/streak", streak_days_query(user_id, today)),
+        ("/heatmap", activity_between_query(user_id, date(today.year, 1, 1), date(today.year, 12, 31))),
+        ("/search typeahead", search_users_query("qp_user_12", 8, prefix=True)),
+        ("/search typeahead next page",
+         search_users_query("qp_user_12", 8, encode_search_cursor("qp_user_120", user_id), prefix=True)),
+        ("/search substring", search_users_query("user_123", 20)),
+        ("push job claim", claimable_job_query(datetime.now(timezone.utc))),
+    ]
+
+
+def _seq_scans(plan: dict, found: list):
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in WATCHED_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        _seq_scans(child, found)
+    return found
+
+
+def check_query_plans(users: int, logs_per_user: int, verbose: bool = False) -> bool:
+    ok = True
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            print(f"[check_query_plans.py] Seeding {users} users x {logs_per_user} push logs...")
+            for sql in SEED_SQL:
+                conn.execute(text(sql), {"users": users, "logs": logs_per_user})
+            for table in sorted(WATCHED_TABLES):
+                conn.execute(text(f"ANALYZE {table}"))
+
+            user_id, username, github_id = conn.execute(
+                text("SELECT id, username, github_id FROM users WHERE username = :name"),
+                {"name": f"qp_user_{users // 2}"}
+            ).one()
+
+            for name, stmt in hot_queries(user_id, username, github_id):
+                compiled = stmt.compile(dialect=conn.dialect)
+                plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params).scalar()
+                plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+                scans = _seq_scans(plan, [])
+                status = "FAIL" if scans else "ok"
+                print(f"  [{status}] {name} (cost {plan['Total Cost']:.0f})"
+                      + (f" - seq scan on {', '.join(scans)}" if scans else ""))
+                if verbose or scans:
+                    print("      " + json.dumps(plan)[:2000])
+                ok = ok and not scans
+        finally:
+            trans.rollback()
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail if a hot query plans a sequential scan.")
+    parser.add_argument("--users", type=int, default=5000, help="Synthetic users to seed")
+    parser.add_argument("--logs-per-user", type=int, default=40, help="Push logs per synthetic user")
+    parser.add_argument("--verbose", action="store_true", help="Print every plan")
+
+    args = parser.parse_args()
+    passed = check_query_plans(args.users, args.logs_per_user, args.verbose)
+    print("All hot queries use indexes." if passed else "Query plan regression detected.")
+    sys.exit(0 if passed else 1)
@@ -7,7 +7,7 @@ from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-from models import User, PushLog, Solution
+from models import User, PushLog, Solution, PushJob, LeaderboardEntry, UserStats, ActivityDay
 from database import Base
 
 # Load environment variables
@@ -33,6 +33,10 @@ SessionLocal = sessionmaker(bind=engine)
 def delete_user_by_id(user_id: int):
     db = SessionLocal()
     try:
+        db.query(PushJob).filter(PushJob.user_id == user_id).delete()
+        db.query(LeaderboardEntry).filter(LeaderboardEntry.user_id == user_id).delete()
+        db.query(UserStats).filter(UserStats.user_id == user_id).delete()
+        db.query(ActivityDay).filter(ActivityDay.user_id == user_id).delete()
         db.query(PushLog).filter(PushLog.user_id == user_id).delete()
         db.query(Solution).filter(Solution.user_id == user_id).delete()
         db.query(User).filter(User.id == user_id).delete()
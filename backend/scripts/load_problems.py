@@ -0,0 +1,156 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import io
+import csv
+import json
+import argparse
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from models import Problem
+from problem_catalog import DIFFICULTY_POINTS
+
+# Bulk-load the problem catalog (slug, difficulty, point, frontend id) from a
+# local JSON or CSV snapshot. By default rows are streamed with COPY into a
+# temporary table and merged with one INSERT ... ON CONFLICT; --method upsert
+# uses batched multi-row upserts instead. Push logs recorded before their
+# problem was known are linked afterwards. The running app picks the new
+# catalog up on restart or via POST /admin/problem-catalog/reload.
+#
+#   python scripts/load_problems.py problems.json
+#   python scripts/load_problems.py problems.csv --method upsert
+
+# Load environment variables
+def get_database_url():
+    env_path = os.getenv("ENV_PATH")
+    if env_path:
+        print(f"[load_problems.py] Loading custom ENV_PATH: {env_path}")
+        load_dotenv(env_path)
+        return os.getenv("DATABASE_URL", "").replace("+asyncpg", "").replace("@db", "@localhost")
+    else:
+        print("[load_problems.py] Loading default .env/.env.railway")
+        load_dotenv(".env")
+        return os.getenv("DATABASE_URL", "").replace("+asyncpg", "")
+
+DATABASE_URL = get_database_url()
+print(f"[load_problems.py] Using DATABASE_URL: {DATABASE_URL}")
+
+
+engine = create_engine(DATABASE_URL)
+
+
+def _normalize(record: dict):
+    """Accept our own field names as well as LeetCode's (titleSlug, questionFrontendId)"""
+    slug = (record.get("slug") or record.get("titleSlug") or "").strip().lower()
+    if not slug:
+        return None
+    difficulty = (record.get("difficulty") or "").strip().capitalize() or None
+    point = record.get("point")
+    if point in (None, ""):
+        point = DIFFICULTY_POINTS.get(difficulty)
+    frontend_id = record.get("frontend_id") or record.get("questionFrontendId")
+    return {
+        "slug": slug,
+        "difficulty": difficulty,
+        "point": int(point) if point is not None else None,
+        "frontend_id": str(frontend_id).strip() if frontend_id not in (None, "") else None
+    }
+
+
+def read_snapshot(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            records = list(csv.DictReader(f))
+        else:
+            records = json.load(f)
+            if isinstance(records, dict):
+                # e.g. {"problems": [...]} / {"questions": [...]}
+                records = records.get("problems") or records.get("questions") or []
+
+    problems = {}
+    for record in records:
+        problem = _normalize(record)
+        if problem:
+            problems[problem["slug"]] = problem  # last one wins on duplicates
+    return list(problems.values())
+
+
+def load_with_copy(conn, problems: list):
+    conn.execute(text("""
+        CREATE TEMP TABLE problems_stage (slug text, difficulty text, point integer, frontend_id text)
+        ON COMMIT DROP
+    """))
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for p in problems:
+        writer.writerow([p["slug"], p["difficulty"] or "", "" if p["point"] is None else p["point"], p["frontend_id"] or ""])
+    buffer.seek(0)
+
+    cursor = conn.connection.cursor()
+    cursor.copy_expert(
+        "COPY problems_stage (slug, difficulty, point, frontend_id) FROM STDIN WITH (FORMAT csv, NULL '')",
+        buffer
+    )
+
+    conn.execute(text("""
+        INSERT INTO problems (slug, difficulty, point, frontend_id)
+        SELECT slug, difficulty, point, frontend_id FROM problems_stage
+        ON CONFLICT (slug) DO UPDATE
+        SET difficulty = EXCLUDED.difficulty, point = EXCLUDED.point, frontend_id = EXCLUDED.frontend_id
+    """))
+
+
+def load_with_upserts(conn, problems: list, batch_size: int):
+    for start in range(0, len(problems), batch_size):
+        stmt = pg_insert(Problem).values(problems[start:start + batch_size])
+        conn.execute(stmt.on_conflict_do_update(
+            index_elements=["slug"],
+            set_={
+                "difficulty": stmt.excluded.difficulty,
+                "point": stmt.excluded.point,
+                "frontend_id": stmt.excluded.frontend_id
+            }
+        ))
+
+
+def link_push_logs(conn):
+    """Attach problems to push logs that were recorded before the problem was in the catalog"""
+    result = conn.execute(text("""
+        UPDATE push_logs pl
+        SET problem_id = p.id, point = p.point
+        FROM problems p
+        WHERE pl.problem_id IS NULL AND pl.problem_slug = p.slug
+    """))
+    return result.rowcount
+
+
+def load_problems(path: str, method: str = "copy", batch_size: int = 1000):
+    problems = read_snapshot(path)
+    print(f"[load_problems.py] Read {len(problems)} problems from {path}")
+    if not problems:
+        return
+
+    with engine.begin() as conn:
+        if method == "copy":
+            load_with_copy(conn, problems)
+        else:
+            load_with_upserts(conn, problems, batch_size)
+        linked = link_push_logs(conn)
+
+    print(f"Loaded {len(problems)} problems ({method}), linked {linked} push logs.")
+    if linked:
+        print("Run scripts/rebuild_leaderboard.py to include the newly linked points.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load the LeetCode problem catalog.")
+    parser.add_argument("path", help="JSON or CSV snapshot with slug, difficulty, point, frontend_id")
+    parser.add_argument("--method", choices=["copy", "upsert"], default="copy", help="COPY into a staging table or batched upserts")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per upsert statement (--method upsert)")
+
+    args = parser.parse_args()
+    load_problems(args.path, args.method, args.batch_size)
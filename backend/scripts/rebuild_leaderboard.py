@@ -0,0 +1,73 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, select, delete, insert, text, func
+from sqlalchemy.orm import sessionmaker
+
+from models import User, PushLog, LeaderboardEntry
+
+# Recompute the leaderboard table from push_logs in one transaction.
+# Run once after deploying the leaderboard migration. Points come from the
+# snapshot stored on each push log.
+
+# Load environment variables
+def get_database_url():
+    env_path = os.getenv("ENV_PATH")
+    if env_path:
+        print(f"[rebuild_leaderboard.py] Loading custom ENV_PATH: {env_path}")
+        load_dotenv(env_path)
+        return os.getenv("DATABASE_URL", "").replace("+asyncpg", "").replace("@db", "@localhost")
+    else:
+        print("[rebuild_leaderboard.py] Loading default .env/.env.railway")
+        load_dotenv(".env")
+        return os.getenv("DATABASE_URL", "").replace("+asyncpg", "")
+
+DATABASE_URL = get_database_url()
+print(f"[rebuild_leaderboard.py] Using DATABASE_URL: {DATABASE_URL}")
+
+
+engine = create_engine(DATABASE_URL)
+SessionLocal = sessionmaker(bind=engine)
+
+
+def rebuild_leaderboard():
+    db = SessionLocal()
+    try:
+        # Taken before reading push_logs: pushes that commit before this are
+        # counted here, pushes still in flight apply their delta after the swap
+        db.execute(text("LOCK TABLE leaderboard IN EXCLUSIVE MODE"))
+
+        totals = {user_id: {"user_id": user_id, "total_solved": 0, "total_point": 0, "by_language": {}}
+                  for user_id in db.execute(select(User.id)).scalars()}
+        for user_id, language, solved, points in db.execute(
+            select(
+                PushLog.user_id,
+                PushLog.language,
+                func.count(),
+                func.coalesce(func.sum(PushLog.point), 0)
+            )
+            .where(PushLog.user_id.isnot(None))
+            .group_by(PushLog.user_id, PushLog.language)
+        ):
+            row = totals.setdefault(user_id, {"user_id": user_id, "total_solved": 0, "total_point": 0, "by_language": {}})
+            row["total_solved"] += solved
+            row["total_point"] += points
+            row["by_language"][language] = solved
+
+        rows = list(totals.values())
+        db.execute(delete(LeaderboardEntry))
+        if rows:
+            db.execute(insert(LeaderboardEntry), rows)
+        db.commit()
+        print(f"Leaderboard rebuilt for {len(rows)} users.")
+    except Exception as e:
+        db.rollback()
+        print("Error:", e)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_leaderboard()
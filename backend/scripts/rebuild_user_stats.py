@@ -0,0 +1,98 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from itertools import groupby
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, select, delete, insert, text, func
+from sqlalchemy.orm import sessionmaker
+
+from models import User, PushLog, UserStats, ActivityDay
+from user_stats import recent_entry, RECENT_PUSHES
+from activity import longest_streak
+
+# Recompute the user_stats table (/stats, /user/{username}) from push_logs in
+# one transaction. Run once after deploying the user_stats migration.
+
+# Load environment variables
+def get_database_url():
+    env_path = os.getenv("ENV_PATH")
+    if env_path:
+        print(f"[rebuild_user_stats.py] Loading custom ENV_PATH: {env_path}")
+        load_dotenv(env_path)
+        return os.getenv("DATABASE_URL", "").replace("+asyncpg", "").replace("@db", "@localhost")
+    else:
+        print("[rebuild_user_stats.py] Loading default .env/.env.railway")
+        load_dotenv(".env")
+        return os.getenv("DATABASE_URL", "").replace("+asyncpg", "")
+
+DATABASE_URL = get_database_url()
+print(f"[rebuild_user_stats.py] Using DATABASE_URL: {DATABASE_URL}")
+
+
+engine = create_engine(DATABASE_URL)
+SessionLocal = sessionmaker(bind=engine)
+
+
+def rebuild_user_stats():
+    db = SessionLocal()
+    try:
+        # Same ordering argument as rebuild_leaderboard.py
+        db.execute(text("LOCK TABLE user_stats IN EXCLUSIVE MODE"))
+
+        def empty(user_id):
+            return {"user_id": user_id, "total_solved": 0, "by_language": {}, "recent": [], "longest_streak": 0}
+
+        stats = {user_id: empty(user_id) for user_id in db.execute(select(User.id)).scalars()}
+        logged = (PushLog.user_id.isnot(None), PushLog.timestamp.isnot(None))
+
+        for user_id, language, solved in db.execute(
+            select(PushLog.user_id, PushLog.language, func.count())
+            .where(*logged)
+            .group_by(PushLog.user_id, PushLog.language)
+        ):
+            row = stats.setdefault(user_id, empty(user_id))
+            row["total_solved"] += solved
+            row["by_language"][language] = solved
+
+        ranked = (
+            select(
+                PushLog.user_id,
+                PushLog.filename,
+                PushLog.timestamp,
+                func.row_number().over(
+                    partition_by=PushLog.user_id,
+                    order_by=(PushLog.timestamp.desc(), PushLog.id.desc())
+                ).label("rn")
+            )
+            .where(*logged)
+            .subquery()
+        )
+        for user_id, filename, timestamp in db.execute(
+            select(ranked.c.user_id, ranked.c.filename, ranked.c.timestamp)
+            .where(ranked.c.rn <= RECENT_PUSHES)
+            .order_by(ranked.c.user_id, ranked.c.rn)
+        ):
+            stats.setdefault(user_id, empty(user_id))["recent"].append(recent_entry(filename, timestamp))
+
+        for user_id, group in groupby(
+            db.execute(select(ActivityDay.user_id, ActivityDay.day).order_by(ActivityDay.user_id, ActivityDay.day)),
+            key=lambda row: row[0]
+        ):
+            stats.setdefault(user_id, empty(user_id))["longest_streak"] = longest_streak([day for _, day in group])
+
+        rows = list(stats.values())
+        db.execute(delete(UserStats))
+        if rows:
+            db.execute(insert(UserStats), rows)
+        db.commit()
+        print(f"User stats rebuilt for {len(rows)} users.")
+    except Exception as e:
+        db.rollback()
+        print("Error:", e)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_user_stats()
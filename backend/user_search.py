@@ -0,0 +1,76 @@
+import json
+import base64
+from fastapi import HTTPException
+from sqlalchemy import select, func, or_, and_
+from models import User, UserStats
+
+# Username search. Both modes match on lower(username), which is covered by
+# two indexes (see the add_user_search_indexes migration):
+#   - "prefix" (typeahead): LIKE 'q%' served by a C-collation btree that also
+#     returns rows already in order, so a small LIMIT stops early;
+#   - "substring": LIKE '%q%' served by a pg_trgm GIN index.
+# Solve counts come from user_stats in the same query, and pages continue
+# with a keyset cursor on (lower(username), id).
+
+SEARCH_MAX_LIMIT = 50
+TYPEAHEAD_MAX_LIMIT = 10
+
+
+def _like_escape(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def encode_search_cursor(name: str, user_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([name, user_id]).encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str):
+    try:
+        name, user_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return str(name), int(user_id)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def search_users_query(term: str, limit: int, cursor: str = None, prefix: bool = False):
+    """The search page query for a normalized (stripped, lower-cased, non-empty) term"""
+    pattern = _like_escape(term) + "%"
+    if not prefix:
+        pattern = "%" + pattern
+    # C collation so ordering and the prefix LIKE both match the btree index;
+    # the substring LIKE stays on the plain expression the trigram index covers
+    name = func.lower(User.username).collate("C")
+    match = name if prefix else func.lower(User.username)
+
+    query = (
+        select(User.id, User.username, name.label("name"), func.coalesce(UserStats.total_solved, 0))
+        .outerjoin(UserStats, UserStats.user_id == User.id)
+        .where(match.like(pattern, escape="\\"))
+        .order_by(name, User.id)
+        .limit(limit + 1)
+    )
+    if cursor:
+        after_name, after_id = decode_search_cursor(cursor)
+        query = query.where(or_(name > after_name, and_(name == after_name, User.id > after_id)))
+    return query
+
+
+async def search_users(db, term: str, limit: int, cursor: str = None, prefix: bool = False) -> dict:
+    term = term.strip().lower()
+    if not term:
+        return {"results": [], "next_cursor": None}
+
+    rows = (await db.execute(search_users_query(term, limit, cursor, prefix))).all()
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = encode_search_cursor(last.name, last.id)
+
+    return {
+        "results": [
+            {"username": username, "total_solved": total_solved}
+            for _, username, _, total_solved in page
+        ],
+        "next_cursor": next_cursor
+    }
@@ -0,0 +1,76 @@
+from datetime import datetime, timezone
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from models import User, UserStats
+
+# Precomputed per-user counters behind /stats and /user/{username}: total,
+# by-language counts and the last few pushes. Updated in the transaction that
+# records a push; scripts/rebuild_user_stats.py recomputes them from push_logs.
+
+RECENT_PUSHES = 5
+
+
+def _recent_key(item):
+    return datetime.fromisoformat(item["timestamp"])
+
+
+def recent_entry(filename: str, timestamp) -> dict:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return {"filename": filename, "timestamp": timestamp.isoformat()}
+
+
+def build_user_stats(logs) -> dict:
+    """Fold (filename, language, timestamp) tuples into {"total_solved", "by_language", "recent"}"""
+    stats = {"total_solved": 0, "by_language": {}, "recent": []}
+    recent = []
+    for filename, language, timestamp in logs:
+        if timestamp is None:
+            continue
+        stats["total_solved"] += 1
+        stats["by_language"][language] = stats["by_language"].get(language, 0) + 1
+        recent.append(recent_entry(filename, timestamp))
+    stats["recent"] = sorted(recent, key=_recent_key, reverse=True)[:RECENT_PUSHES]
+    return stats
+
+
+async def apply_to_user_stats(db, user_id: int, logs):
+    """Add pushed (filename, language, timestamp) tuples to a user's stats row; the caller commits"""
+    logs = list(logs)
+    if not logs:
+        return
+    delta = build_user_stats(logs)
+
+    await db.execute(
+        pg_insert(UserStats)
+        .values(user_id=user_id, total_solved=0, by_language={}, recent=[])
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+    result = await db.execute(select(UserStats).where(UserStats.user_id == user_id).with_for_update())
+    stats = result.scalar_one()
+
+    by_language = dict(stats.by_language or {})
+    for language, count in delta["by_language"].items():
+        by_language[language] = by_language.get(language, 0) + count
+    stats.total_solved = (stats.total_solved or 0) + delta["total_solved"]
+    stats.by_language = by_language
+    stats.recent = sorted(list(stats.recent or []) + delta["recent"], key=_recent_key, reverse=True)[:RECENT_PUSHES]
+
+
+def serialize_user_stats(stats) -> dict:
+    if stats is None:
+        return {"total_solved": 0, "by_language": {}, "recent": []}
+    return {
+        "total_solved": stats.total_solved,
+        "by_language": stats.by_language or {},
+        "recent": stats.recent or []
+    }
+
+
+def user_detail_query(username: str):
+    """A public profile: the username and its user_stats row (None if the user never pushed)"""
+    return (
+        select(User.username, UserStats)
+        .outerjoin(UserStats, UserStats.user_id == User.id)
+        .where(User.username == username)
+    )
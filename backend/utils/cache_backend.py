@@ -0,0 +1,186 @@
+import os
+import json
+import time
+from utils.cache import TTLCache
+
+# Cache backend shared by the caching points that have to agree across
+# uvicorn workers / replicas (auth scheme, repo existence, problem lookups,
+# response cache and its generations).
+#
+# CACHE_BACKEND=memory (default) keeps a bounded LRU+TTL per namespace in
+# this process. CACHE_BACKEND=redis talks to any Redis-protocol server at
+# REDIS_URL (redis, valkey, a local stand-in in tests); values are stored as
+# JSON. If the redis package is missing we fall back to memory. Errors from
+# the server are treated as misses so a cache outage never fails a request.
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REDIS_KEY_PREFIX = os.getenv("REDIS_KEY_PREFIX", "lit1337")
+
+_caches = {}
+_redis = None
+
+
+def _encode_key(key) -> str:
+    return key if isinstance(key, str) else json.dumps(key, separators=(",", ":"), default=str)
+
+
+class _Stats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def timed(self, started: float):
+        elapsed = (time.perf_counter() - started) * 1000
+        self.calls += 1
+        self.total_ms += elapsed
+        self.max_ms = max(self.max_ms, elapsed)
+
+    def snapshot(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class MemoryCache:
+    """Namespace cache backed by an in-process TTLCache"""
+
+    backend = "memory"
+
+    def __init__(self, namespace: str, maxsize: int, ttl: float):
+        self.namespace = namespace
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._stats = _Stats()
+
+    async def get(self, key, default=None):
+        started = time.perf_counter()
+        value = self._cache.get(_encode_key(key), default)
+        if value is default:
+            self._stats.misses += 1
+        else:
+            self._stats.hits += 1
+        self._stats.timed(started)
+        return value
+
+    async def set(self, key, value, ttl: float = None):
+        started = time.perf_counter()
+        self._cache.set(_encode_key(key), value, ttl=ttl)
+        self._stats.timed(started)
+
+    async def delete(self, key):
+        self._cache.delete(_encode_key(key))
+
+    async def incr(self, key) -> int:
+        value = self._cache.get(_encode_key(key), 0) + 1
+        self._cache.set(_encode_key(key), value, ttl=0)
+        return value
+
+    def stats(self):
+        return {"backend": self.backend, "size": len(self._cache), "evictions": self._cache.evictions, **self._stats.snapshot()}
+
+
+class RedisCache:
+    """Namespace cache stored on a Redis-protocol server; keys are prefix:namespace:key"""
+
+    backend = "redis"
+
+    def __init__(self, namespace: str, ttl: float, client):
+        self.namespace = namespace
+        self.ttl = ttl
+        self._client = client
+        self._stats = _Stats()
+
+    def _key(self, key) -> str:
+        return f"{REDIS_KEY_PREFIX}:{self.namespace}:{_encode_key(key)}"
+
+    def _error(self, op: str, e: Exception):
+        self._stats.errors += 1
+        print(f"[cache_backend.py] Redis {op} failed for {self.namespace}: {str(e)}")
+
+    async def get(self, key, default=None):
+        started = time.perf_counter()
+        try:
+            raw = await self._client.get(self._key(key))
+        except Exception as e:
+            self._error("get", e)
+            raw = None
+        finally:
+            self._stats.timed(started)
+        if raw is None:
+            self._stats.misses += 1
+            return default
+        self._stats.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key, value, ttl: float = None):
+        ttl = self.ttl if ttl is None else ttl
+        started = time.perf_counter()
+        try:
+            # px rather than ex so sub-second TTLs survive
+            await self._client.set(self._key(key), json.dumps(value), px=int(ttl * 1000) if ttl else None)
+        except Exception as e:
+            self._error("set", e)
+        finally:
+            self._stats.timed(started)
+
+    async def delete(self, key):
+        try:
+            await self._client.delete(self._key(key))
+        except Exception as e:
+            self._error("delete", e)
+
+    async def incr(self, key) -> int:
+        try:
+            return await self._client.incr(self._key(key))
+        except Exception as e:
+            self._error("incr", e)
+            return 0
+
+    def stats(self):
+        return {"backend": self.backend, **self._stats.snapshot()}
+
+
+def _redis_client():
+    global _redis
+    if _redis is None:
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError:
+            print("[cache_backend.py] CACHE_BACKEND=redis but the 'redis' package is not installed, using memory")
+            return None
+        _redis = redis_asyncio.from_url(REDIS_URL)
+    return _redis
+
+
+def get_cache(namespace: str, maxsize: int = 1024, ttl: float = 300.0):
+    """Cache for a namespace using the configured backend (created once per namespace)"""
+    cache = _caches.get(namespace)
+    if cache is None:
+        client = _redis_client() if CACHE_BACKEND == "redis" else None
+        if client is not None:
+            cache = RedisCache(namespace, ttl, client)
+        else:
+            cache = MemoryCache(namespace, maxsize, ttl)
+        _caches[namespace] = cache
+    return cache
+
+
+async def close_cache_backends():
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+def get_cache_backend_stats():
+    return {namespace: cache.stats() for namespace, cache in _caches.items()}
@@ -1,38 +1,207 @@
+import os
+import asyncio
 import httpx
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from database import SessionLocal
+from models import Problem
+from problem_catalog import ProblemInfo, DIFFICULTY_POINTS, get_problem, extend_problem_catalog
+from utils.cache_backend import get_cache
 
-GRAPHQL_ENDPOINT = "https://leetcode.com/graphql"
+# Problem metadata lookups. Answers come from the problem catalog / problems
+# table first; only slugs we have never seen go to LeetCode, and those are
+# sent as one aliased GraphQL query per batch instead of one request each.
+# Concurrent lookups of the same slug share a single fetch, and results are
+# written back to the problems table so the next lookup never leaves the DB.
+# LEETCODE_GRAPHQL_ENDPOINT can point at a local stand-in server.
 
-async def get_problem_difficulty(slug: str):
-    query = {
-        "operationName": "getQuestionDetail",
-        "query": """
-            query getQuestionDetail($titleSlug: String!) {
-                question(titleSlug: $titleSlug) {
-                    questionFrontendId
-                    difficulty
-                }
-            }
-        """,
-        "variables": {"titleSlug": slug}
-    }
+GRAPHQL_ENDPOINT = os.getenv("LEETCODE_GRAPHQL_ENDPOINT", "https://leetcode.com/graphql")
+LEETCODE_BATCH_SIZE = int(os.getenv("LEETCODE_BATCH_SIZE", "50"))
+LEETCODE_TIMEOUT = float(os.getenv("LEETCODE_TIMEOUT", "10"))
+# Slugs LeetCode doesn't know are not asked for again for a while
+LEETCODE_NOT_FOUND_TTL = float(os.getenv("LEETCODE_NOT_FOUND_TTL", "600"))
+# ... and slugs whose lookup failed (error status, timeout) for a shorter while
+LEETCODE_ERROR_TTL = float(os.getenv("LEETCODE_ERROR_TTL", "30"))
+
+_client = None
+_in_flight = {}
+_not_found = get_cache("leetcode_not_found", maxsize=4096, ttl=LEETCODE_NOT_FOUND_TTL)
+
+_stats = {
+    "lookups": 0,
+    "catalog_hits": 0,
+    "db_hits": 0,
+    "shared_fetches": 0,
+    "graphql_requests": 0,
+    "fetched": 0,
+    "not_found": 0,
+    "errors": 0,
+}
+
+
+def problem_slug_from_filename(filename: str) -> str:
+    """'0001_Two_Sum.py' -> 'two-sum'"""
+    return filename.split("_", 1)[-1].rsplit(".", 1)[0].replace("_", "-").lower()
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(timeout=LEETCODE_TIMEOUT, headers={"Content-Type": "application/json"})
+    return _client
 
-    headers = {
-        "Content-Type": "application/json"
+
+async def close_leetcode_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _batch_query(slugs: list) -> dict:
+    """One GraphQL document asking for every slug under its own alias (q0, q1, ...)"""
+    params = ", ".join(f"$s{i}: String!" for i in range(len(slugs)))
+    fields = "\n".join(
+        f"q{i}: question(titleSlug: $s{i}) {{ titleSlug questionFrontendId difficulty }}"
+        for i in range(len(slugs))
+    )
+    return {
+        "operationName": "getQuestionDetails",
+        "query": f"query getQuestionDetails({params}) {{\n{fields}\n}}",
+        "variables": {f"s{i}": slug for i, slug in enumerate(slugs)}
     }
 
-    async with httpx.AsyncClient() as client:
-        res = await client.post(GRAPHQL_ENDPOINT, json=query, headers=headers)
-        if res.status_code != 200:
-            return None
-
-        data = res.json()
-        q = data.get("data", {}).get("question")
-        if not q:
-            return None
-
-        difficulty = q.get("difficulty")  # Easy, Medium, Hard
-        number = q.get("questionFrontendId").zfill(4)
-        return {
-            "difficulty": difficulty,
-            "number": number
+
+async def _fetch_from_leetcode(slugs: list) -> dict:
+    """slug -> {"difficulty", "frontend_id"} for the slugs LeetCode knows"""
+    found = {}
+    client = _get_client()
+    for start in range(0, len(slugs), LEETCODE_BATCH_SIZE):
+        chunk = slugs[start:start + LEETCODE_BATCH_SIZE]
+        _stats["graphql_requests"] += 1
+        try:
+            res = await client.post(GRAPHQL_ENDPOINT, json=_batch_query(chunk))
+            error = None if res.status_code == 200 else res.status_code
+        except httpx.HTTPError as e:
+            error = f"{type(e).__name__}: {str(e)}"
+        if error is not None:
+            print(f"[leetcode.py] GraphQL lookup failed: {error}")
+            _stats["errors"] += 1
+            for slug in chunk:
+                await _not_found.set(slug, True, ttl=LEETCODE_ERROR_TTL)
+            continue
+
+        data = res.json().get("data") or {}
+        for i, slug in enumerate(chunk):
+            q = data.get(f"q{i}")
+            if not q:
+                await _not_found.set(slug, True)
+                _stats["not_found"] += 1
+                continue
+            found[slug] = {"difficulty": q.get("difficulty"), "frontend_id": q.get("questionFrontendId")}
+    _stats["fetched"] += len(found)
+    return found
+
+
+async def _save_problems(fetched: dict) -> dict:
+    """Upsert fetched metadata into problems; returns slug -> ProblemInfo"""
+    if not fetched:
+        return {}
+    values = [
+        {
+            "slug": slug,
+            "difficulty": meta["difficulty"],
+            "point": DIFFICULTY_POINTS.get(meta["difficulty"]),
+            "frontend_id": meta["frontend_id"]
         }
+        for slug, meta in fetched.items()
+    ]
+    stmt = pg_insert(Problem).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["slug"],
+        set_={
+            "difficulty": stmt.excluded.difficulty,
+            "frontend_id": stmt.excluded.frontend_id,
+            # keep points that were loaded explicitly
+            "point": func.coalesce(Problem.point, stmt.excluded.point)
+        }
+    ).returning(Problem.id, Problem.slug, Problem.difficulty, Problem.point, Problem.frontend_id)
+    async with SessionLocal() as db:
+        result = await db.execute(stmt)
+        problems = [ProblemInfo(*row) for row in result.all()]
+        await db.commit()
+    extend_problem_catalog(problems)
+    return {p.slug: p for p in problems}
+
+
+async def _load_missing(slugs: list) -> dict:
+    """DB first, then LeetCode for whatever is still missing"""
+    async with SessionLocal() as db:
+        result = await db.execute(
+            select(Problem.id, Problem.slug, Problem.difficulty, Problem.point, Problem.frontend_id)
+            .where(Problem.slug.in_(slugs))
+        )
+        known = {row.slug: ProblemInfo(*row) for row in result.all()}
+    _stats["db_hits"] += len(known)
+    extend_problem_catalog(known.values())
+
+    missing = [slug for slug in slugs if slug not in known and await _not_found.get(slug) is None]
+    if missing:
+        known.update(await _save_problems(await _fetch_from_leetcode(missing)))
+    return known
+
+
+async def get_problems(slugs) -> dict:
+    """slug -> ProblemInfo for every slug that could be resolved"""
+    _stats["lookups"] += 1
+    result = {}
+    waiting = {}
+    to_load = []
+    for slug in dict.fromkeys(slugs):
+        problem = get_problem(slug)
+        if problem is not None:
+            _stats["catalog_hits"] += 1
+            result[slug] = problem
+        elif slug in _in_flight:
+            # someone is already fetching this slug - share their result
+            _stats["shared_fetches"] += 1
+            waiting[slug] = _in_flight[slug]
+        else:
+            to_load.append(slug)
+
+    if to_load:
+        task = asyncio.ensure_future(_load_missing(to_load))
+        for slug in to_load:
+            _in_flight[slug] = task
+            waiting[slug] = task
+
+        def _forget(t, slugs=to_load):
+            for slug in slugs:
+                if _in_flight.get(slug) is t:
+                    del _in_flight[slug]
+        task.add_done_callback(_forget)
+
+    for slug, task in waiting.items():
+        try:
+            loaded = await asyncio.shield(task)
+        except Exception as e:
+            print(f"[leetcode.py] Lookup of {slug} failed: {str(e)}")
+            _stats["errors"] += 1
+            continue
+        if slug in loaded:
+            result[slug] = loaded[slug]
+    return result
+
+
+async def get_problem_difficulty(slug: str):
+    problem = (await get_problems([slug])).get(slug)
+    if not problem or not problem.difficulty:
+        return None
+    return {
+        "difficulty": problem.difficulty,  # Easy, Medium, Hard
+        "number": (problem.frontend_id or "").zfill(4)
+    }
+
+
+def get_leetcode_lookup_stats():
+    return {**_stats, "in_flight": len(_in_flight), "not_found_cache": _not_found.stats()}
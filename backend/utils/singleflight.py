@@ -0,0 +1,30 @@
+import asyncio
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key onto one in-flight operation"""
+
+    def __init__(self):
+        self._calls = {}
+        self.started = 0
+        self.shared = 0
+
+    async def do(self, key, fn):
+        """Run fn() once per key at a time; concurrent callers await the same result"""
+        task = self._calls.get(key)
+        if task is not None:
+            self.shared += 1
+        else:
+            self.started += 1
+            # Run as a task so one caller going away doesn't cancel it for the others
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def stats(self):
+        return {"in_flight": len(self._calls), "started": self.started, "shared": self.shared}